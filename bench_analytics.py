@@ -0,0 +1,63 @@
+"""
+Analytics Benchmark for RevampBot
+Measures in-memory ingest, rollup flush and !stats query time against a
+scratch database
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from cogs.analytics import DAY, HOUR, ActivityAggregator
+from database import DatabaseManager
+
+
+def run(events=1000000, guilds=50, channels=20, users=5000, hours=24):
+    """Ingest synthetic messages spread over the last `hours`, then flush and query"""
+    rng = random.Random(42)
+    now = int(time.time())
+    # Pre-generate so only record() is timed
+    batch = [
+        (rng.randrange(guilds), rng.randrange(channels), rng.randrange(users), now - rng.randrange(hours * HOUR))
+        for _ in range(events)
+    ]
+
+    aggregator = ActivityAggregator()
+    start = time.perf_counter()
+    for guild_id, channel_id, user_id, timestamp in batch:
+        aggregator.record(guild_id, channel_id, user_id, timestamp)
+    ingest = time.perf_counter() - start
+    print(f"📥 Ingest: {events:,} events in {ingest:.2f}s ({events / ingest:,.0f} events/s), "
+          f"{len(aggregator):,} distinct buckets")
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = DatabaseManager(os.path.join(directory, "bench.db"))
+        database.connect()
+        database.initialize_schema()
+
+        buckets = len(aggregator)
+        start = time.perf_counter()
+        database.flush_activity(aggregator.drain())
+        flush = time.perf_counter() - start
+        print(f"💾 Flush: {buckets:,} buckets in {flush:.2f}s ({buckets / flush:,.0f} rows/s)")
+
+        for days in (1, 7):
+            since = now - days * DAY
+            start = time.perf_counter()
+            database.get_activity_summary(0, since)
+            database.get_activity_series(0, since)
+            print(f"📈 !stats {days}d: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        database.close()
+
+
+def main():
+    print("\n🤖 RevampBot Analytics Benchmark")
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    run(events)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Backup Benchmark for RevampBot
+Measures export and import rows/sec for user_xp in JSONL and CSV, and an
+online backup taken while another connection keeps committing writes
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from database import DatabaseManager
+from db_backup import backup_database, export_table, import_table
+
+
+def _writer(db_path, users, stop, commits):
+    """Commit single-row XP updates as fast as possible, like a busy bot"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    rng = random.Random(7)
+    while not stop.is_set():
+        conn.execute('UPDATE user_xp SET xp = xp + 1 WHERE user_id = ? AND guild_id = 1', (rng.randrange(users),))
+        conn.commit()
+        commits[0] += 1
+    conn.close()
+
+
+def run(rows=2000000):
+    """Fill user_xp with `rows` rows, then export, import and back it up"""
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench.db")
+        database = DatabaseManager(db_path)
+        database.connect()
+        database.initialize_schema()
+        database.connection.executemany(
+            'INSERT INTO user_xp (user_id, guild_id, xp, level, total_messages) VALUES (?, 1, ?, ?, ?)',
+            ((user_id, rng.randrange(10 ** 6), rng.randrange(1, 100), rng.randrange(10 ** 4))
+             for user_id in range(rows))
+        )
+        database.connection.commit()
+        print(f"🗃️ Seeded {rows:,} user_xp rows ({os.path.getsize(db_path):,} bytes)")
+
+        for fmt in ("jsonl", "csv"):
+            out_path = os.path.join(directory, f"user_xp.{fmt}")
+            export_table("user_xp", out_path, fmt, db_path)
+            database.connection.execute('DELETE FROM user_xp')
+            database.connection.commit()
+            import_table("user_xp", out_path, fmt, db_path)
+            os.remove(out_path)
+
+        stop, commits = threading.Event(), [0]
+        writer = threading.Thread(target=_writer, args=(db_path, rows, stop, commits))
+        writer.start()
+        time.sleep(0.2)
+        before = commits[0]
+        try:
+            backup_database(os.path.join(directory, "backup.db"), db_path)
+        finally:
+            during = commits[0] - before
+            stop.set()
+            writer.join()
+        print(f"✍️ Writer committed {during:,} updates while the backup ran")
+
+        backup = sqlite3.connect(os.path.join(directory, "backup.db"))
+        copied = backup.execute('SELECT COUNT(*) FROM user_xp').fetchone()[0]
+        integrity = backup.execute('PRAGMA integrity_check').fetchone()[0]
+        backup.close()
+        print(f"🔍 Backup holds {copied:,} rows, integrity_check: {integrity}")
+
+        database.close()
+
+
+def main():
+    print("\n🤖 RevampBot Backup Benchmark")
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    run(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Guild Config Benchmark for RevampBot
+Measures startup reconciliation (reconcile_guild_configs) with all, none
+and half of the guilds missing a row, and bulk override writes
+(set_guild_configs), each against a scratch database
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from database import DatabaseManager
+from guild_config import config_diff, default_config
+
+
+def _fresh(directory: str, name: str) -> DatabaseManager:
+    database = DatabaseManager(os.path.join(directory, f"{name}.db"))
+    database.connect()
+    database.initialize_schema()
+    return database
+
+
+def run(guilds=100000):
+    """Reconcile and bulk-write `guilds` guilds' configs"""
+    guild_ids = list(range(1, guilds + 1))
+    with tempfile.TemporaryDirectory() as directory:
+        for label, existing in (("all missing", []),
+                                ("none missing", guild_ids),
+                                ("half missing", guild_ids[::2])):
+            database = _fresh(directory, label.replace(" ", "_"))
+            database.reconcile_guild_configs(existing)
+
+            start = time.perf_counter()
+            added = database.reconcile_guild_configs(guild_ids)
+            elapsed = time.perf_counter() - start
+            print(f"🔄 reconcile_guild_configs ({label}): {guilds:,} guilds, {added:,} added "
+                  f"in {elapsed * 1000:.0f}ms ({guilds / elapsed:,.0f} guilds/s)")
+            database.close()
+
+        # A typical override: the channels set up by !setup plus a few toggles
+        defaults = default_config()
+        configs = {}
+        for guild_id in guild_ids:
+            config = default_config()
+            config['welcome_channel'] = guild_id * 10
+            config['log_channel'] = guild_id * 10 + 1
+            config['auto_roles'] = [guild_id * 10 + 2]
+            configs[guild_id] = config_diff(defaults, config)
+
+        database = _fresh(directory, "set")
+        start = time.perf_counter()
+        database.set_guild_configs(configs)
+        elapsed = time.perf_counter() - start
+        size = sum(len(row[0]) for row in database.connection.execute('SELECT config_data FROM guild_config'))
+        print(f"💾 set_guild_configs: {guilds:,} guilds in {elapsed * 1000:.0f}ms "
+              f"({guilds / elapsed:,.0f} guilds/s, {size / guilds:.0f} bytes stored per guild)")
+        database.close()
+
+
+def main():
+    print("\n🤖 RevampBot Guild Config Benchmark")
+    guilds = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    run(guilds)
+
+
+if __name__ == "__main__":
+    main()
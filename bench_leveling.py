@@ -0,0 +1,62 @@
+"""
+Leveling Benchmark for RevampBot
+Measures LevelCurve.level_for_xp lookups and a full-guild level
+recalculation (!setcurve) against a scratch database
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from cogs.leveling import CURVES, LevelCurve
+from database import DatabaseManager
+
+
+def run(rows=1000000, guild_id=1):
+    """Look up levels for `rows` XP values, then recalculate them in one guild"""
+    rng = random.Random(42)
+    curves = {name: LevelCurve(name, 100, 1.2) for name in CURVES}
+    xps = [int(rng.paretovariate(1.2) * 50) for _ in range(rows)]
+
+    for name, curve in curves.items():
+        start = time.perf_counter()
+        for xp in xps:
+            curve.level_for_xp(xp)
+        elapsed = time.perf_counter() - start
+        print(f"🔎 level_for_xp ({name}): {rows:,} lookups in {elapsed:.2f}s "
+              f"({rows / elapsed:,.0f}/s, max level {curve.max_level:,})")
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = DatabaseManager(os.path.join(directory, "bench.db"))
+        database.connect()
+        database.initialize_schema()
+        database.connection.executemany(
+            'INSERT INTO user_xp (user_id, guild_id, xp, level) VALUES (?, ?, ?, 1)',
+            ((user_id, guild_id, xp) for user_id, xp in enumerate(xps))
+        )
+        database.connection.commit()
+
+        for name, curve in curves.items():
+            start = time.perf_counter()
+            updated = database.recalculate_levels(guild_id, curve.thresholds)
+            elapsed = time.perf_counter() - start
+            print(f"🧮 recalculate_levels ({name}): {updated:,} rows in {elapsed:.2f}s "
+                  f"({updated / elapsed:,.0f} rows/s)")
+
+        start = time.perf_counter()
+        database.get_leaderboard(guild_id)
+        print(f"🏆 get_leaderboard: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        database.close()
+
+
+def main():
+    print("\n🤖 RevampBot Leveling Benchmark")
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    run(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Member Cache Benchmark for RevampBot
+Measures max RSS growth from holding synthetic members under the full and
+low memory profiles. balanced falls in between, depending on how many
+members are seen over time. Each profile runs in its own process, since
+max RSS only grows.
+"""
+
+import asyncio
+import gc
+import resource
+import subprocess
+import sys
+
+import discord
+
+from member_cache import MemberLRU, client_cache_options
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+async def measure(profile: str, members: int, lru_size: int):
+    client = discord.Client(intents=discord.Intents.all(), **client_cache_options(profile))
+    state = client._connection
+    guild = discord.Guild(data={
+        'id': '1', 'name': 'bench', 'roles': [], 'emojis': [], 'stickers': [],
+        'features': [], 'member_count': members, 'channels': []
+    }, state=state)
+    lru = MemberLRU(lru_size if profile != 'full' else 0)
+    cache_members = state.member_cache_flags.joined
+
+    baseline = _max_rss_mb()
+    for i in range(members):
+        member = discord.Member(data={
+            'user': {'id': str(10 ** 17 + i), 'username': f'user{i}', 'discriminator': '0',
+                     'avatar': None, 'global_name': None},
+            'roles': [], 'joined_at': None, 'deaf': False, 'mute': False, 'flags': 0
+        }, guild=guild, state=state)
+        if cache_members:
+            guild._add_member(member)
+        else:
+            lru.put(member)
+    gc.collect()
+
+    print(f"  {profile:<9} guild cache {len(guild._members):>8,}  LRU {len(lru):>7,}  "
+          f"max RSS +{_max_rss_mb() - baseline:,.0f}MB")
+
+
+def main():
+    members = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    lru_size = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    if len(sys.argv) > 3:
+        asyncio.run(measure(sys.argv[3], members, lru_size))
+        return
+
+    print(f"\n🤖 RevampBot Member Cache Benchmark ({members:,} members, LRU {lru_size:,})")
+    for profile in ('full', 'low'):
+        subprocess.run([sys.executable, __file__, str(members), str(lru_size), profile], check=True)
+
+
+if __name__ == "__main__":
+    main()
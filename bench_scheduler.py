@@ -0,0 +1,96 @@
+"""
+Scheduler Benchmark for RevampBot
+Measures queue wait (p50/p95/p99) per priority class while one guild
+floods commands and many other guilds use the bot normally
+"""
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+from scheduler import BUSY_MESSAGE, CommandScheduler
+
+WORK_MS = 20
+PRIORITY_MIX = (('high', 0.1), ('normal', 0.7), ('low', 0.2))
+
+
+def make_ctx(guild_id: int, priority: str, shed: dict):
+    async def send(content):
+        if content == BUSY_MESSAGE:
+            shed[guild_id == 1] += 1
+
+    return SimpleNamespace(
+        command=SimpleNamespace(qualified_name=f'bench-{priority}', extras={'priority': priority}),
+        guild=SimpleNamespace(id=guild_id),
+        channel=SimpleNamespace(id=guild_id),
+        send=send,
+        priority=priority
+    )
+
+
+async def run(seconds=5.0, guilds=100, rate=400.0, flood_rate=2000.0):
+    """Other guilds submit `rate` commands/s between them; guild 1 submits `flood_rate`/s"""
+    rng = random.Random(42)
+    scheduler = CommandScheduler(busy_reply_interval=0)
+    scheduler.start()
+    waits = defaultdict(list)
+    shed = defaultdict(int)
+    submissions = []
+
+    async def invoke(ctx):
+        waits[(ctx.priority, ctx.guild.id == 1)].append(time.perf_counter() - ctx.submitted_at)
+        await asyncio.sleep(rng.expovariate(1000 / WORK_MS))
+
+    def submit(guild_id, priority):
+        ctx = make_ctx(guild_id, priority, shed)
+        ctx.submitted_at = time.perf_counter()
+        submissions.append(asyncio.create_task(scheduler.submit(ctx, invoke)))
+
+    async def flooder():
+        while True:
+            # Only the guild's own queue cap holds it back
+            for _ in range(int(flood_rate / 100)):
+                submit(1, rng.choices(['normal', 'low'], [0.5, 0.5])[0])
+            await asyncio.sleep(0.01)
+
+    async def community():
+        names, weights = zip(*PRIORITY_MIX)
+        while True:
+            await asyncio.sleep(rng.expovariate(rate))
+            submit(rng.randrange(2, guilds + 2), rng.choices(names, weights)[0])
+
+    producers = [asyncio.create_task(flooder()), asyncio.create_task(community())]
+    await asyncio.sleep(seconds)
+    for producer in producers:
+        producer.cancel()
+    await asyncio.gather(*producers, return_exceptions=True)
+    await scheduler.drain(timeout=30)
+    await asyncio.gather(*submissions)
+    await scheduler.stop()
+
+    stats = scheduler.metrics()
+    print(f"📨 {len(submissions):,} submitted, {stats['completed']:,} completed, "
+          f"shed {shed[True]:,} from the flooding guild and {shed[False]:,} from others")
+    for flooding, label in ((True, 'flooding guild'), (False, f'{guilds} other guilds')):
+        print(f"  {'🌊' if flooding else '👥'} {label}")
+        for priority, _ in PRIORITY_MIX:
+            samples = waits.get((priority, flooding))
+            if not samples:
+                continue
+            cuts = statistics.quantiles(samples, n=100, method='inclusive')
+            print(f"    {priority:<7} p50 {cuts[49] * 1000:7.1f}ms  p95 {cuts[94] * 1000:7.1f}ms  "
+                  f"p99 {cuts[98] * 1000:7.1f}ms  ({len(samples):,} commands)")
+
+
+def main():
+    print(f"\n🤖 RevampBot Scheduler Benchmark (work ~{WORK_MS}ms per command)")
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    asyncio.run(run(seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Startup Benchmark for RevampBot
+Measures cold versus warm (checkpointed) restarts: time from constructing
+the bot through setup_hook, then the first pass over every guild's config
+and leaderboard. Each start runs in its own process, like a real restart,
+against a scratch database; no Discord connection is made.
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from database import DatabaseManager
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def seed(db_path: str, guilds: int, users: int):
+    """Give every guild a config override and some XP rows"""
+    rng = random.Random(42)
+    database = DatabaseManager(db_path)
+    database.connect()
+    database.initialize_schema()
+    database.set_guild_configs({guild_id: {'log_channel': guild_id * 10} for guild_id in range(1, guilds + 1)})
+    database.connection.executemany(
+        'INSERT INTO user_xp (user_id, guild_id, xp, level) VALUES (?, ?, ?, 1)',
+        ((user_id, guild_id, rng.randrange(10 ** 5)) for guild_id in range(1, guilds + 1) for user_id in range(users))
+    )
+    database.connection.commit()
+    database.close()
+
+
+async def measure(directory: str, guilds: int):
+    spec = importlib.util.spec_from_file_location('revampbot', os.path.join(ROOT, 'enhanced-revampbot.py'))
+    revampbot = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(revampbot)
+    config = revampbot.BotConfig(
+        database_path=os.path.join(directory, 'bench.db'),
+        checkpoint_path=os.path.join(directory, 'revampbot.checkpoint'),
+        log_level='WARNING'
+    )
+
+    start = time.perf_counter()
+    bot = revampbot.EnhancedRevampBot(config)
+    # Entering the client binds it to the running loop, as login() would
+    async with bot:
+        await bot.setup_hook()
+        ready = time.perf_counter() - start
+
+        # What the first commands and events after a restart touch
+        start = time.perf_counter()
+        leveling = bot.get_cog('Leveling')
+        for guild_id in range(1, guilds + 1):
+            bot.get_guild_config(guild_id)
+            leveling.get_leaderboard(guild_id)
+        first_pass = time.perf_counter() - start
+
+        warm = bot.lifecycle.warm_start
+        # Writes the checkpoint the next start loads
+        await bot.close()
+    print(json.dumps({'warm': warm, 'ready': ready, 'first_pass': first_pass}))
+
+
+def main():
+    guilds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    if len(sys.argv) > 3:
+        asyncio.run(measure(sys.argv[3], guilds))
+        return
+
+    print(f"\n🤖 RevampBot Startup Benchmark ({guilds:,} guilds, {users:,} members each)")
+    with tempfile.TemporaryDirectory() as directory:
+        seed(os.path.join(directory, 'bench.db'), guilds, users)
+        # The first start is cold and writes a checkpoint on close; the second loads it
+        for label in ('Cold', 'Warm'):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), str(guilds), str(users), directory],
+                cwd=directory, check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            icon = '🧊' if label == 'Cold' else '🔥'
+            print(f"{icon} {label} start (checkpoint loaded: {result['warm']}): "
+                  f"setup {result['ready'] * 1000:.0f}ms, "
+                  f"first pass over guilds {result['first_pass'] * 1000:.0f}ms, "
+                  f"total {(result['ready'] + result['first_pass']) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# analytics.py - Time-bucketed activity rollups and stats commands
+import datetime
+import logging
+import time
+from collections import Counter
+from typing import Optional
+
+import discord
+from discord.ext import commands, tasks
+
+HOUR = 3600
+DAY = 86400
+
+
+class ActivityAggregator:
+    """In-memory message counters keyed by (guild, hour bucket, channel, user)"""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.events = 0
+
+    def record(self, guild_id: int, channel_id: int, user_id: int, timestamp: Optional[float] = None):
+        ts = int(timestamp if timestamp is not None else time.time())
+        self.counts[(guild_id, ts - ts % HOUR, channel_id, user_id)] += 1
+        self.events += 1
+
+    def drain(self) -> Counter:
+        """Hand over the buffered counts and start a fresh buffer"""
+        counts, self.counts = self.counts, Counter()
+        return counts
+
+    def restore(self, counts: Counter):
+        """Merge counts back after a failed flush"""
+        self.counts.update(counts)
+
+    def __len__(self):
+        return len(self.counts)
+
+
+class Analytics(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.logger = logging.getLogger('RevampBot.Analytics')
+        self.aggregator = ActivityAggregator()
+        self.flush_activity.change_interval(seconds=bot.config.analytics_flush_interval)
+
+    async def cog_load(self):
+        self.flush_activity.start()
+        self.compact_activity.start()
+        self.bot.lifecycle.register('analytics', self)
+
+    async def cog_unload(self):
+        self.bot.lifecycle.unregister('analytics')
+        self.flush_activity.cancel()
+        self.compact_activity.cancel()
+        self.flush()
+
+    def flush(self) -> Optional[Counter]:
+        """Write buffered counts to the hourly rollup; returns the counts written"""
+        if not self.aggregator:
+            return None
+        counts = self.aggregator.drain()
+        if not self.bot.database.flush_activity(counts):
+            self.aggregator.restore(counts)
+            return None
+        return counts
+
+    def restore_pending(self, counts: Counter):
+        """Take back counts whose write was rolled back"""
+        self.aggregator.restore(counts)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.author.bot or message.guild is None:
+            return
+        self.aggregator.record(
+            message.guild.id, message.channel.id, message.author.id,
+            message.created_at.timestamp()
+        )
+
+    @tasks.loop(seconds=60)
+    async def flush_activity(self):
+        self.flush()
+
+    @tasks.loop(hours=1)
+    async def compact_activity(self):
+        """Fold hourly buckets past the retention window into daily buckets"""
+        now = int(time.time())
+        cutoff = now - self.bot.config.analytics_hourly_retention_days * DAY
+        cutoff -= cutoff % DAY
+        compacted = self.bot.database.compact_activity(cutoff)
+        if compacted:
+            self.logger.info(f"Compacted {compacted} hourly activity buckets")
+
+    @commands.command(name='stats', extras={'priority': 'low'})
+    async def stats(self, ctx, days: int = 7):
+        """Show server activity for the last N days"""
+        days = max(1, min(days, 365))
+        # Served from the rollups only, so messages since the last flush are not counted yet
+        since = int(time.time()) - days * DAY
+        summary = self.bot.database.get_activity_summary(ctx.guild.id, since)
+        series = self.bot.database.get_activity_series(ctx.guild.id, since)
+
+        embed = discord.Embed(title=f"📈 Activity - last {days} days", color=discord.Color.blue())
+        embed.add_field(name="Messages", value=summary['messages'], inline=True)
+        embed.add_field(name="Active Members", value=summary['active_users'], inline=True)
+        embed.add_field(name="Active Channels", value=summary['active_channels'], inline=True)
+
+        if summary['top_channels']:
+            embed.add_field(
+                name="Top Channels",
+                value='\n'.join(f"<#{row['id']}> - {row['messages']}" for row in summary['top_channels']),
+                inline=True
+            )
+        if summary['top_users']:
+            embed.add_field(
+                name="Top Members",
+                value='\n'.join(f"<@{row['id']}> - {row['messages']}" for row in summary['top_users']),
+                inline=True
+            )
+        if series:
+            embed.add_field(
+                name="Per Day",
+                value='\n'.join(
+                    f"{datetime.datetime.fromtimestamp(row['bucket'], datetime.timezone.utc):%b %d} - {row['messages']}"
+                    for row in series[-14:]
+                ),
+                inline=False
+            )
+        embed.set_footer(text=f"Updated every {self.bot.config.analytics_flush_interval}s")
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Analytics(bot))
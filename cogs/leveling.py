@@ -0,0 +1,307 @@
+# leveling.py - XP, level curves, reward roles and level-up announcements
+import bisect
+import logging
+import math
+import random
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import discord
+from discord.ext import commands, tasks
+from member_cache import CachedMember, find_member
+
+CURVES = ('linear', 'quadratic', 'exponential')
+MAX_LEVEL = 1000
+MAX_XP = 2 ** 62  # Stay well inside SQLite's signed 64-bit INTEGER
+MIN_BASE = 0.01
+MAX_BASE = 10 ** 12
+MAX_FACTOR = 10.0
+LEADERBOARD_TTL = 60
+
+DEFAULT_LEVELING = {
+    'curve': 'quadratic',
+    'base': 100,
+    'factor': 1.2,
+    'reward_roles': {},
+    'announce_cooldown': 30
+}
+
+
+class LevelCurve:
+    """Precomputed XP-to-level lookup table
+
+    thresholds[i] is the minimum total XP for level i + 1, so level lookup
+    is a binary search over the table instead of a loop over levels.
+    """
+
+    def __init__(self, name: str, base: float, factor: float, max_level: int = MAX_LEVEL):
+        if name not in CURVES:
+            raise ValueError(f"Unknown curve '{name}', expected one of: {', '.join(CURVES)}")
+        if not (math.isfinite(base) and math.isfinite(factor)):
+            raise ValueError("Curve base and factor must be finite numbers")
+        if not MIN_BASE <= base <= MAX_BASE:
+            raise ValueError(f"Curve base must be between {MIN_BASE} and {MAX_BASE:,}")
+        if name == 'exponential' and not 1 < factor <= MAX_FACTOR:
+            raise ValueError(f"Exponential factor must be above 1 and at most {MAX_FACTOR:g}")
+
+        self.name = name
+        self.base = base
+        self.factor = factor
+        self.thresholds: List[int] = [0]
+        for level in range(2, max_level + 1):
+            xp = self._threshold(level)
+            if xp > MAX_XP:
+                break
+            # Keep the table strictly increasing even for tiny bases
+            self.thresholds.append(max(xp, self.thresholds[-1] + 1))
+
+    def _threshold(self, level: int) -> int:
+        n = level - 1
+        if self.name == 'linear':
+            return int(self.base * n)
+        if self.name == 'quadratic':
+            return int(self.base * n * n)
+        return int(self.base * (self.factor ** n - 1) / (self.factor - 1))
+
+    @property
+    def max_level(self) -> int:
+        return len(self.thresholds)
+
+    def level_for_xp(self, xp: int) -> int:
+        """Level reached with the given total XP"""
+        return max(1, bisect.bisect_right(self.thresholds, xp))
+
+    def xp_for_level(self, level: int) -> int:
+        """Minimum total XP for a level"""
+        return self.thresholds[min(max(level, 1), self.max_level) - 1]
+
+
+@lru_cache(maxsize=64)
+def get_curve(name: str, base: float, factor: float) -> LevelCurve:
+    """Build (or reuse) the lookup table for a curve configuration"""
+    return LevelCurve(name, base, factor)
+
+
+class Leveling(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.logger = logging.getLogger('RevampBot.Leveling')
+        self.xp_cooldowns: Dict[Tuple[int, int], float] = {}
+        self.last_announcement: Dict[int, float] = {}
+        self.leaderboards: Dict[int, Tuple[float, List[Dict]]] = {}
+
+    async def cog_load(self):
+        self.prune_state.start()
+        self.bot.lifecycle.register('leveling', self)
+
+    async def cog_unload(self):
+        self.bot.lifecycle.unregister('leveling')
+        self.prune_state.cancel()
+
+    @tasks.loop(minutes=5)
+    async def prune_state(self):
+        """Drop expired cooldowns and leaderboards so memory tracks recent activity only"""
+        now = time.monotonic()
+        cooldown = self.bot.config.cooldown_seconds
+        self.xp_cooldowns = {key: ts for key, ts in self.xp_cooldowns.items() if now - ts < cooldown}
+        self.leaderboards = {
+            guild_id: cached for guild_id, cached in self.leaderboards.items()
+            if now - cached[0] < LEADERBOARD_TTL
+        }
+
+    def snapshot(self) -> Dict:
+        """Hot state for the restart checkpoint, with monotonic times converted to wall-clock"""
+        offset = time.time() - time.monotonic()
+        cooldown = self.bot.config.cooldown_seconds
+        now = time.monotonic()
+        return {
+            'xp_cooldowns': [
+                (guild_id, user_id, ts + offset)
+                for (guild_id, user_id), ts in self.xp_cooldowns.items()
+                if now - ts < cooldown
+            ],
+            'last_announcement': {guild_id: ts + offset for guild_id, ts in self.last_announcement.items()},
+            'leaderboards': {
+                guild_id: (ts + offset, rows)
+                for guild_id, (ts, rows) in self.leaderboards.items()
+                if now - ts < LEADERBOARD_TTL
+            }
+        }
+
+    def restore(self, state: Dict):
+        offset = time.monotonic() - time.time()
+        for guild_id, user_id, ts in state.get('xp_cooldowns', []):
+            self.xp_cooldowns[(guild_id, user_id)] = ts + offset
+        for guild_id, ts in state.get('last_announcement', {}).items():
+            self.last_announcement[guild_id] = ts + offset
+        for guild_id, (ts, rows) in state.get('leaderboards', {}).items():
+            self.leaderboards[guild_id] = (ts + offset, rows)
+
+    def get_leaderboard(self, guild_id: int) -> List[Dict]:
+        """Leaderboard head, cached briefly so repeated !leaderboard calls skip the DB"""
+        cached = self.leaderboards.get(guild_id)
+        if cached and time.monotonic() - cached[0] < LEADERBOARD_TTL:
+            return cached[1]
+        rows = self.bot.database.get_leaderboard(guild_id)
+        self.leaderboards[guild_id] = (time.monotonic(), rows)
+        return rows
+
+    def leveling_config(self, guild_id: int) -> Dict:
+        config = self.bot.get_guild_config(guild_id)
+        return {**DEFAULT_LEVELING, **config.get('leveling', {})}
+
+    def curve_for(self, guild_id: int) -> LevelCurve:
+        settings = self.leveling_config(guild_id)
+        try:
+            return get_curve(settings['curve'], float(settings['base']), float(settings['factor']))
+        except ValueError as e:
+            # Settings saved before the current bounds were enforced
+            self.logger.warning(f"Invalid level curve for guild {guild_id}, using the default: {e}")
+            return get_curve(DEFAULT_LEVELING['curve'], float(DEFAULT_LEVELING['base']),
+                             float(DEFAULT_LEVELING['factor']))
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        """Award XP for messages, respecting the per-user cooldown"""
+        if message.author.bot or message.guild is None:
+            return
+        if message.content.startswith(self.bot.config.prefix):
+            return
+
+        key = (message.guild.id, message.author.id)
+        now = time.monotonic()
+        if now - self.xp_cooldowns.get(key, float('-inf')) < self.bot.config.cooldown_seconds:
+            return
+        self.xp_cooldowns[key] = now
+
+        curve = self.curve_for(message.guild.id)
+        row = self.bot.database.get_user_xp(message.author.id, message.guild.id)
+        old_xp = row['xp'] if row else 0
+        old_level = curve.level_for_xp(old_xp)
+        new_xp = old_xp + random.randint(1, self.bot.config.max_xp_per_message)
+        new_level = curve.level_for_xp(new_xp)
+
+        self.bot.database.update_user_xp(message.author.id, message.guild.id, new_xp, new_level)
+
+        if new_level > old_level:
+            await self.handle_level_up(message, old_level, new_level)
+
+    async def handle_level_up(self, message: discord.Message, old_level: int, new_level: int):
+        """Grant reward roles and announce the level-up"""
+        guild = message.guild
+        settings = self.leveling_config(guild.id)
+
+        rewards = self.reward_roles_between(guild, settings, old_level, new_level)
+        if rewards and isinstance(message.author, discord.Member):
+            try:
+                await message.author.add_roles(*rewards, reason=f"Reached level {new_level}", atomic=False)
+            except discord.HTTPException as e:
+                self.logger.error(f"Failed to grant reward roles in guild {guild.id}: {e}")
+
+        config = self.bot.get_guild_config(guild.id)
+        if not config.get('level_up_notifications', True):
+            return
+
+        # Throttle announcements per guild so busy channels aren't flooded
+        now = time.monotonic()
+        if now - self.last_announcement.get(guild.id, float('-inf')) < settings['announce_cooldown']:
+            return
+        self.last_announcement[guild.id] = now
+
+        embed = discord.Embed(
+            title="🎉 Level Up!",
+            description=f"{message.author.mention} reached **level {new_level}**!",
+            color=discord.Color.gold()
+        )
+        if rewards:
+            embed.add_field(name="Rewards", value=", ".join(r.mention for r in rewards), inline=False)
+        try:
+            await message.channel.send(embed=embed)
+        except discord.HTTPException as e:
+            self.logger.error(f"Failed to announce level-up in guild {guild.id}: {e}")
+
+    def reward_roles_between(self, guild: discord.Guild, settings: Dict,
+                             old_level: int, new_level: int) -> List[discord.Role]:
+        """Reward roles for levels in (old_level, new_level]"""
+        reward_map = {int(level): int(role_id) for level, role_id in settings['reward_roles'].items()}
+        levels = sorted(reward_map)
+        start = bisect.bisect_right(levels, old_level)
+        end = bisect.bisect_right(levels, new_level)
+        roles = (guild.get_role(reward_map[level]) for level in levels[start:end])
+        return [role for role in roles if role is not None]
+
+    @commands.command(name='rank')
+    async def rank(self, ctx, member: Optional[CachedMember] = None):
+        """Show a member's level and XP"""
+        member = member or ctx.author
+        row = self.bot.database.get_user_xp(member.id, ctx.guild.id)
+        curve = self.curve_for(ctx.guild.id)
+        xp = row['xp'] if row else 0
+        level = curve.level_for_xp(xp)
+
+        embed = discord.Embed(title=f"📊 {member.display_name}", color=discord.Color.blue())
+        embed.add_field(name="Level", value=level, inline=True)
+        embed.add_field(name="XP", value=xp, inline=True)
+        if level < curve.max_level:
+            embed.add_field(name="Next Level", value=f"{curve.xp_for_level(level + 1) - xp} XP to go", inline=True)
+        await ctx.send(embed=embed)
+
+    @commands.command(name='leaderboard')
+    async def leaderboard(self, ctx):
+        """Show the top members by XP"""
+        rows = self.get_leaderboard(ctx.guild.id)
+        lines = []
+        for position, row in enumerate(rows, start=1):
+            member = find_member(self.bot, ctx.guild, row['user_id'])
+            name = member.display_name if member else f"User {row['user_id']}"
+            lines.append(f"**{position}.** {name} - level {row['level']} ({row['xp']} XP)")
+
+        embed = discord.Embed(
+            title="🏆 Leaderboard",
+            description='\n'.join(lines) or "No activity yet.",
+            color=discord.Color.gold()
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name='setcurve', extras={'priority': 'low', 'concurrency': 1})
+    @commands.has_permissions(administrator=True)
+    async def set_curve(self, ctx, name: str, base: float = 100, factor: float = 1.2):
+        """Change the guild's level curve and recalculate all levels"""
+        try:
+            get_curve(name, base, factor)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+
+        config = dict(self.bot.get_guild_config(ctx.guild.id))
+        config['leveling'] = {**config.get('leveling', {}), 'curve': name, 'base': base, 'factor': factor}
+        self.bot.save_guild_config(ctx.guild.id, config)
+
+        updated = self.bot.database.recalculate_levels(ctx.guild.id, self.curve_for(ctx.guild.id).thresholds)
+        self.leaderboards.pop(ctx.guild.id, None)
+        await ctx.send(f"✅ Level curve set to **{name}**; recalculated {updated} members.")
+
+    @commands.command(name='levelrole')
+    @commands.has_permissions(manage_roles=True)
+    async def level_role(self, ctx, level: int, role: Optional[discord.Role] = None):
+        """Set (or clear, when no role is given) the reward role for a level"""
+        config = dict(self.bot.get_guild_config(ctx.guild.id))
+        leveling = {**config.get('leveling', {})}
+        rewards = dict(leveling.get('reward_roles', {}))
+        if role is None:
+            rewards.pop(str(level), None)
+        else:
+            rewards[str(level)] = role.id
+        leveling['reward_roles'] = rewards
+        config['leveling'] = leveling
+        self.bot.save_guild_config(ctx.guild.id, config)
+
+        if role is None:
+            await ctx.send(f"✅ Cleared reward role for level {level}.")
+        else:
+            await ctx.send(f"✅ Members reaching level {level} will receive {role.mention}.")
+
+
+async def setup(bot):
+    await bot.add_cog(Leveling(bot))
@@ -1,31 +1,182 @@
 # moderation.py - Moderation commands cog
+import datetime
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
+from member_cache import CachedMember
+
+AUDIT_BATCH_SIZE = 100
+MODLOG_PAGE_SIZE = 10
+MIRROR_GROUP_SIZE = 20
+REASON_PREVIEW = 100
+EMBED_DESCRIPTION_LIMIT = 4000  # Discord allows 4096
+ACTION_ICONS = {'kick': '👢', 'ban': '🔨', 'clear': '🧹'}
+
 
 class Moderation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.logger = logging.getLogger('RevampBot.Moderation')
+        self.pending_audit: List[tuple] = []
+        self.pending_mirror: Dict[int, List[tuple]] = defaultdict(list)
+
+    async def cog_load(self):
+        self.flush_audit.start()
+        self.bot.lifecycle.register('moderation', self)
+
+    async def cog_unload(self):
+        self.bot.lifecycle.unregister('moderation')
+        self.flush_audit.cancel()
+        self.flush()
+        await self._send_mirrors()
+
+    async def drain(self, timeout: float):
+        """Mirror pending actions to the log channels before shutdown"""
+        await self._send_mirrors()
+
+    def flush(self) -> Optional[List[tuple]]:
+        """Append buffered audit rows to moderation_logs; returns the rows written"""
+        if not self.pending_audit:
+            return None
+        rows, self.pending_audit = self.pending_audit, []
+        if not self.bot.database.log_moderation_actions(rows):
+            self.restore_pending(rows)
+            return None
+        return rows
+
+    def restore_pending(self, rows: List[tuple]):
+        """Take back audit rows whose write was rolled back"""
+        self.pending_audit = rows + self.pending_audit
+
+    def audit(self, ctx, target_user_id: int, action_type: str, reason: Optional[str] = None):
+        """Buffer a moderation action for the audit log and the log channel"""
+        timestamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        row = (ctx.guild.id, ctx.author.id, target_user_id, action_type, reason, timestamp)
+        self.pending_audit.append(row)
+        if self.bot.get_guild_config(ctx.guild.id).get('log_channel'):
+            self.pending_mirror[ctx.guild.id].append(row)
+        if len(self.pending_audit) >= AUDIT_BATCH_SIZE:
+            self.flush()
+
+    @tasks.loop(seconds=5)
+    async def flush_audit(self):
+        self.flush()
+        await self._send_mirrors()
 
-    @commands.command()
+    async def _send_mirrors(self):
+        pending, self.pending_mirror = self.pending_mirror, defaultdict(list)
+        for guild_id, rows in pending.items():
+            channel_id = self.bot.get_guild_config(guild_id).get('log_channel')
+            guild = self.bot.get_guild(guild_id)
+            channel = guild.get_channel(int(channel_id)) if guild and channel_id else None
+            if channel is None:
+                continue
+
+            lines = [self._format_row(*row[1:]) for row in rows]
+            for chunk in self._pack(lines, MIRROR_GROUP_SIZE):
+                embed = discord.Embed(
+                    title=f"🛡️ {len(chunk)} moderation action{'s' if len(chunk) != 1 else ''}",
+                    description='\n'.join(chunk),
+                    color=discord.Color.orange()
+                )
+                try:
+                    await channel.send(embed=embed)
+                except discord.HTTPException as e:
+                    self.logger.error(f"Failed to mirror moderation log in guild {guild_id}: {e}")
+
+    @staticmethod
+    def _format_row(moderator_id, target_user_id, action_type, reason, timestamp) -> str:
+        target = f" <@{target_user_id}>" if target_user_id else ""
+        line = f"{ACTION_ICONS.get(action_type, '•')} `{timestamp}` **{action_type}**{target} by <@{moderator_id}>"
+        if not reason:
+            return line
+        if len(reason) > REASON_PREVIEW:
+            reason = reason[:REASON_PREVIEW - 1] + '…'
+        return f"{line} - {reason}"
+
+    @staticmethod
+    def _pack(lines: List[str], max_lines: int) -> List[List[str]]:
+        """Group lines into embed descriptions within both the line and length limits"""
+        chunks, chunk, length = [], [], 0
+        for line in lines:
+            if chunk and (len(chunk) >= max_lines or length + len(line) + 1 > EMBED_DESCRIPTION_LIMIT):
+                chunks.append(chunk)
+                chunk, length = [], 0
+            chunk.append(line)
+            length += len(line) + 1
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    @commands.command(extras={'priority': 'high'})
     @commands.has_permissions(kick_members=True)
-    async def kick(self, ctx, member: discord.Member, *, reason=None):
+    async def kick(self, ctx, member: CachedMember, *, reason=None):
         """Kick a member from the server"""
         await member.kick(reason=reason)
+        self.audit(ctx, member.id, 'kick', reason)
         await ctx.send(f'{member.mention} has been kicked. Reason: {reason}')
 
-    @commands.command()
+    @commands.command(extras={'priority': 'high'})
     @commands.has_permissions(ban_members=True)
-    async def ban(self, ctx, member: discord.Member, *, reason=None):
+    async def ban(self, ctx, member: CachedMember, *, reason=None):
         """Ban a member from the server"""
         await member.ban(reason=reason)
+        self.audit(ctx, member.id, 'ban', reason)
         await ctx.send(f'{member.mention} has been banned. Reason: {reason}')
 
-    @commands.command()
+    @commands.command(extras={'priority': 'high', 'concurrency': 4})
     @commands.has_permissions(manage_messages=True)
     async def clear(self, ctx, amount: int):
         """Clear a specified number of messages"""
         await ctx.channel.purge(limit=amount + 1)
+        self.audit(ctx, 0, 'clear', f'{amount} messages in #{ctx.channel}')
         await ctx.send(f'Cleared {amount} messages.', delete_after=5)
 
+    @commands.group(name='modlog', invoke_without_command=True, extras={'priority': 'low'})
+    @commands.has_permissions(view_audit_log=True)
+    async def modlog(self, ctx, user: Optional[discord.User] = None, before: Optional[int] = None):
+        """Show moderation history for the server or a user"""
+        await self._send_history(
+            ctx, f"🛡️ Moderation log - {user}" if user else "🛡️ Moderation log",
+            f"{ctx.prefix}modlog {user.id} " if user else f"{ctx.prefix}modlog ",
+            before, target_user_id=user.id if user else None
+        )
+
+    @modlog.command(name='by', extras={'priority': 'low'})
+    @commands.has_permissions(view_audit_log=True)
+    async def modlog_by(self, ctx, moderator: discord.User, before: Optional[int] = None):
+        """Show the actions taken by a moderator"""
+        await self._send_history(
+            ctx, f"🛡️ Actions by {moderator}", f"{ctx.prefix}modlog by {moderator.id} ",
+            before, moderator_id=moderator.id
+        )
+
+    async def _send_history(self, ctx, title: str, next_command: str, before: Optional[int], **filters):
+        # Include whatever is still buffered so the history is current
+        self.flush()
+        rows = self.bot.database.get_moderation_history(
+            ctx.guild.id, before_id=before, limit=MODLOG_PAGE_SIZE, **filters
+        )
+        if not rows:
+            await ctx.send("No moderation actions found.")
+            return
+
+        lines = [
+            f"`#{row['id']}` " + self._format_row(
+                row['moderator_id'], row['target_user_id'], row['action_type'],
+                row['reason'], row['timestamp']
+            )
+            for row in rows
+        ]
+        shown = self._pack(lines, MODLOG_PAGE_SIZE)[0]
+        embed = discord.Embed(title=title, description='\n'.join(shown), color=discord.Color.orange())
+        if len(rows) == MODLOG_PAGE_SIZE or len(shown) < len(rows):
+            embed.set_footer(text=f"Next page: {next_command}{rows[len(shown) - 1]['id']}")
+        await ctx.send(embed=embed)
+
+
 async def setup(bot):
     await bot.add_cog(Moderation(bot))
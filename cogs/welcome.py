@@ -0,0 +1,282 @@
+# welcome.py - Member join pipeline (welcome messages and auto-roles)
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Set
+
+import discord
+from discord.ext import commands, tasks
+
+
+@dataclass
+class RoleJob:
+    """A pending auto-role assignment for a freshly joined member"""
+    member: discord.Member
+    role_ids: List[int]
+    attempts: int = 0
+
+
+class TokenBucket:
+    """Simple token bucket used to pace requests against a single guild"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        """Wait until a token is available and consume it"""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RoleAssignmentQueue:
+    """Bounded, rate-limit-aware queue for auto-role assignment"""
+
+    def __init__(self, maxsize: int = 1000, workers: int = 2, rate: float = 2.0,
+                 max_attempts: int = 3, enqueue_timeout: float = 5.0, retry_delay: float = 1.0):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.worker_count = workers
+        self.rate = rate
+        self.max_attempts = max_attempts
+        self.enqueue_timeout = enqueue_timeout
+        self.retry_delay = retry_delay
+        self.buckets: Dict[int, TokenBucket] = {}
+        self.workers: List[asyncio.Task] = []
+        self.retries: Set[asyncio.TimerHandle] = set()
+        self.logger = logging.getLogger('RevampBot.Welcome')
+        self.stats = {'enqueued': 0, 'assigned': 0, 'retried': 0, 'failed': 0, 'dropped': 0}
+
+    def start(self):
+        """Spawn the worker tasks"""
+        for _ in range(self.worker_count):
+            self.workers.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        """Cancel the worker tasks and any scheduled retries"""
+        for handle in self.retries:
+            handle.cancel()
+        self.retries.clear()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers.clear()
+
+    async def put(self, job: RoleJob) -> bool:
+        """Enqueue a job, applying backpressure when the queue is full"""
+        try:
+            await asyncio.wait_for(self.queue.put(job), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.stats['dropped'] += 1
+            self.logger.warning(f"Role queue full, dropped auto-roles for member {job.member.id}")
+            return False
+        self.stats['enqueued'] += 1
+        return True
+
+    async def join(self):
+        """Wait until queued jobs and scheduled retries have all been processed"""
+        while True:
+            await self.queue.join()
+            if not self.retries:
+                return
+            await asyncio.sleep(0.1)
+
+    def _schedule_retry(self, job: RoleJob, delay: float):
+        """Re-enqueue a rate-limited job later without tying up a worker"""
+        def requeue():
+            self.retries.discard(handle)
+            try:
+                self.queue.put_nowait(job)
+            except asyncio.QueueFull:
+                self.stats['dropped'] += 1
+                self.logger.warning(f"Role queue full, dropped auto-role retry for member {job.member.id}")
+
+        handle = asyncio.get_running_loop().call_later(delay, requeue)
+        self.retries.add(handle)
+
+    def _bucket(self, guild_id: int) -> TokenBucket:
+        bucket = self.buckets.get(guild_id)
+        if bucket is None:
+            bucket = self.buckets[guild_id] = TokenBucket(self.rate, max(1, int(self.rate)))
+        return bucket
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._assign(job)
+            except Exception as e:
+                self.stats['failed'] += 1
+                self.logger.error(f"Unexpected error assigning roles to {job.member.id}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _assign(self, job: RoleJob):
+        guild = job.member.guild
+        roles = [r for r in (guild.get_role(rid) for rid in job.role_ids) if r and r not in job.member.roles]
+        if not roles:
+            return
+
+        await self._bucket(guild.id).acquire()
+        try:
+            # Non-atomic add issues a single member PATCH instead of one request per role
+            await job.member.add_roles(*roles, reason="Auto-role on join", atomic=False)
+            self.stats['assigned'] += 1
+        except discord.NotFound:
+            # Member left before we got to them
+            pass
+        except discord.HTTPException as e:
+            # discord.py sleeps through 429s itself, so one only reaches us once its own
+            # retries are exhausted (or Cloudflare blocked us); back off before trying again
+            if e.status == 429 and job.attempts + 1 < self.max_attempts:
+                job.attempts += 1
+                self.stats['retried'] += 1
+                self._schedule_retry(job, self.retry_delay * 2 ** job.attempts)
+            else:
+                self.stats['failed'] += 1
+                self.logger.error(f"Failed to assign auto-roles to {job.member.id}: {e}")
+
+    def metrics(self) -> Dict[str, int]:
+        """Queue depth and counters"""
+        return {'depth': self.queue.qsize(), 'capacity': self.queue.maxsize, **self.stats}
+
+
+class Welcome(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.logger = logging.getLogger('RevampBot.Welcome')
+        config = bot.config
+        self.batch_threshold = config.welcome_batch_threshold
+        self.rate_window = 60.0
+        self.join_times: Dict[int, Deque[float]] = defaultdict(deque)
+        self.pending_welcomes: Dict[int, List[discord.Member]] = defaultdict(list)
+        self.role_queue = RoleAssignmentQueue(
+            maxsize=config.role_queue_size,
+            workers=config.role_queue_workers,
+            rate=config.role_assign_rate
+        )
+        self.flush_welcomes.change_interval(seconds=config.welcome_batch_interval)
+
+    async def cog_load(self):
+        self.role_queue.start()
+        self.flush_welcomes.start()
+        self.bot.lifecycle.register('welcome', self)
+
+    async def cog_unload(self):
+        self.bot.lifecycle.unregister('welcome')
+        self.flush_welcomes.cancel()
+        await self._flush_pending()
+        await self.role_queue.stop()
+
+    async def drain(self, timeout: float):
+        """Send pending welcomes and finish queued role assignments"""
+        await self._flush_pending()
+        await self.role_queue.join()
+
+    def _join_rate(self, guild_id: int) -> int:
+        """Record a join and return the number of joins within the rate window"""
+        now = time.monotonic()
+        times = self.join_times[guild_id]
+        times.append(now)
+        while times and now - times[0] > self.rate_window:
+            times.popleft()
+        return len(times)
+
+    def _welcome_channel(self, guild: discord.Guild, config: Dict) -> Optional[discord.abc.Messageable]:
+        channel_id = config.get('welcome_channel')
+        if not channel_id:
+            return None
+        return guild.get_channel(int(channel_id))
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        """Welcome the new member and queue their auto-roles"""
+        if member.bot:
+            return
+
+        guild = member.guild
+        config = self.bot.get_guild_config(guild.id)
+
+        # Welcome first: enqueueing roles can wait on backpressure during a join wave
+        channel = self._welcome_channel(guild, config)
+        if channel is not None:
+            await self._welcome(guild, channel, member)
+
+        auto_roles = [int(rid) for rid in config.get('auto_roles') or []]
+        if auto_roles:
+            await self.role_queue.put(RoleJob(member, auto_roles))
+
+    async def _welcome(self, guild: discord.Guild, channel: discord.abc.Messageable, member: discord.Member):
+        # During join waves, coalesce welcomes into one periodic embed
+        if self._join_rate(guild.id) >= self.batch_threshold or self.pending_welcomes.get(guild.id):
+            self.pending_welcomes[guild.id].append(member)
+            return
+
+        embed = discord.Embed(
+            title="👋 Welcome!",
+            description=f"Welcome to **{guild.name}**, {member.mention}!",
+            color=discord.Color.green()
+        )
+        try:
+            await channel.send(embed=embed)
+        except discord.HTTPException as e:
+            self.logger.error(f"Failed to send welcome message in guild {guild.id}: {e}")
+
+    @tasks.loop(seconds=10)
+    async def flush_welcomes(self):
+        """Send coalesced welcome embeds for guilds in a join wave"""
+        await self._flush_pending()
+
+    async def _flush_pending(self):
+        pending, self.pending_welcomes = self.pending_welcomes, defaultdict(list)
+        for guild_id, members in pending.items():
+            guild = self.bot.get_guild(guild_id)
+            if guild is None or not members:
+                continue
+            channel = self._welcome_channel(guild, self.bot.get_guild_config(guild_id))
+            if channel is None:
+                continue
+
+            # Keep each embed comfortably within the description limit
+            for start in range(0, len(members), 50):
+                chunk = members[start:start + 50]
+                embed = discord.Embed(
+                    title=f"👋 Welcome to {len(chunk)} new members!",
+                    description=", ".join(m.mention for m in chunk),
+                    color=discord.Color.green()
+                )
+                try:
+                    await channel.send(embed=embed)
+                except discord.HTTPException as e:
+                    self.logger.error(f"Failed to send batched welcome in guild {guild_id}: {e}")
+
+    @commands.command(name='joinstats')
+    @commands.has_permissions(manage_guild=True)
+    async def join_stats(self, ctx):
+        """Show join pipeline queue metrics"""
+        metrics = self.role_queue.metrics()
+        embed = discord.Embed(title="📥 Join Pipeline", color=discord.Color.blue())
+        embed.add_field(name="Role Queue", value=f"{metrics['depth']}/{metrics['capacity']}", inline=True)
+        embed.add_field(name="Assigned", value=metrics['assigned'], inline=True)
+        embed.add_field(name="Retried", value=metrics['retried'], inline=True)
+        embed.add_field(name="Failed", value=metrics['failed'], inline=True)
+        embed.add_field(name="Dropped", value=metrics['dropped'], inline=True)
+        embed.add_field(
+            name="Pending Welcomes",
+            value=sum(len(m) for m in self.pending_welcomes.values()),
+            inline=True
+        )
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Welcome(bot))
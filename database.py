@@ -6,6 +6,7 @@ Handles all database operations with proper error handling
 import sqlite3
 import logging
 import json
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from typing import Optional, Dict, List
 import os
@@ -17,17 +18,51 @@ class DatabaseManager:
         self.db_path = db_path
         self.logger = logging.getLogger('RevampBot.Database')
         self.connection: Optional[sqlite3.Connection] = None
+        self._in_transaction = False
+        self._transaction_failed = False
         
     def connect(self):
         """Establish database connection"""
         try:
             self.connection = sqlite3.connect(self.db_path)
             self.connection.row_factory = sqlite3.Row
+            # WAL lets backups and exports read while the bot keeps writing
+            self.connection.execute('PRAGMA journal_mode=WAL')
             self.logger.info(f"Connected to database: {self.db_path}")
         except sqlite3.Error as e:
             self.logger.error(f"Database connection error: {e}")
             raise
             
+    @contextmanager
+    def transaction(self):
+        """Group several write methods into a single commit
+        
+        Write methods called inside the block skip their own commit. If any
+        of them fails, the whole block is rolled back and sqlite3.Error raised.
+        """
+        self._in_transaction = True
+        self._transaction_failed = False
+        try:
+            yield self
+            if self._transaction_failed:
+                raise sqlite3.Error("a write inside the transaction failed")
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            self._in_transaction = False
+            
+    def _commit(self):
+        if not self._in_transaction:
+            self.connection.commit()
+            
+    def _rollback(self):
+        if self._in_transaction:
+            self._transaction_failed = True
+        else:
+            self.connection.rollback()
+            
     def initialize_schema(self):
         """Create all necessary tables"""
         if not self.connection:
@@ -125,11 +160,42 @@ class DatabaseManager:
                 )
             ''')
             
+            # Activity Rollup Tables (hourly buckets compacted into daily ones)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS activity_hourly (
+                    guild_id INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    channel_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    messages INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (guild_id, bucket, channel_id, user_id)
+                ) WITHOUT ROWID
+            ''')
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS activity_daily (
+                    guild_id INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    channel_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    messages INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (guild_id, bucket, channel_id, user_id)
+                ) WITHOUT ROWID
+            ''')
+            
+            self._migrate_legacy_columns(cursor)
+            
             # Create indexes for better performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_xp_guild ON user_xp(guild_id)')
+            # (guild_id, xp DESC) lets the leaderboard read the top rows in order; it supersedes the guild_id-only index
+            cursor.execute('DROP INDEX IF EXISTS idx_user_xp_guild')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_xp_guild_xp ON user_xp(guild_id, xp DESC)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_showcase_guild ON showcase_projects(guild_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_rsvp_guild ON event_rsvp(guild_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_mod_logs_guild ON moderation_logs(guild_id)')
+            # (guild_id, timestamp) serves guild-wide history in order; it supersedes the guild_id-only index
+            cursor.execute('DROP INDEX IF EXISTS idx_mod_logs_guild')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_mod_logs_guild_time ON moderation_logs(guild_id, timestamp)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_mod_logs_target ON moderation_logs(guild_id, target_user_id, timestamp)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_mod_logs_moderator ON moderation_logs(guild_id, moderator_id, timestamp)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_warnings_user ON user_warnings(user_id, guild_id)')
             
             self.connection.commit()
@@ -141,6 +207,22 @@ class DatabaseManager:
             self.connection.rollback()
             raise
             
+    def _migrate_legacy_columns(self, cursor: sqlite3.Cursor):
+        """Add columns missing from databases created by older bot versions"""
+        expected = {
+            'user_xp': [('total_messages', 'INTEGER DEFAULT 0')],
+            'guild_config': [('updated_at', 'TIMESTAMP')],
+            'showcase_projects': [('github_url', 'TEXT'), ('tags', 'TEXT')],
+            'event_rsvp': [('event_date', 'TIMESTAMP'), ('status', "TEXT DEFAULT 'going'")]
+        }
+        for table, columns in expected.items():
+            cursor.execute(f'PRAGMA table_info({table})')
+            existing = {row[1] for row in cursor.fetchall()}
+            for name, definition in columns:
+                if name not in existing:
+                    cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+                    self.logger.info(f"Added missing column {table}.{name}")
+                    
     def get_user_xp(self, user_id: int, guild_id: int) -> Optional[Dict]:
         """Get user XP data"""
         try:
@@ -169,7 +251,7 @@ class DatabaseManager:
                     total_messages = total_messages + 1
             ''', (user_id, guild_id, xp, level, datetime.now(timezone.utc), 
                   xp, level, datetime.now(timezone.utc)))
-            self.connection.commit()
+            self._commit()
         except sqlite3.Error as e:
             self.logger.error(f"Error updating user XP: {e}")
             
@@ -189,19 +271,166 @@ class DatabaseManager:
             self.logger.error(f"Error getting leaderboard: {e}")
             return []
             
+    def recalculate_levels(self, guild_id: int, thresholds: List[int]) -> int:
+        """Recompute every stored level in a guild from a level curve
+        
+        thresholds[i] is the minimum XP for level i + 1. The curve is loaded
+        into a temp table so all rows are updated by one set-based UPDATE.
+        """
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute('''
+                CREATE TEMP TABLE IF NOT EXISTS level_thresholds (
+                    min_xp INTEGER PRIMARY KEY,
+                    level INTEGER NOT NULL
+                )
+            ''')
+            cursor.execute('DELETE FROM level_thresholds')
+            cursor.executemany(
+                'INSERT INTO level_thresholds (min_xp, level) VALUES (?, ?)',
+                ((min_xp, level) for level, min_xp in enumerate(thresholds, start=1))
+            )
+            cursor.execute('''
+                UPDATE user_xp SET level = COALESCE((
+                    SELECT level FROM level_thresholds
+                    WHERE min_xp <= user_xp.xp
+                    ORDER BY min_xp DESC
+                    LIMIT 1
+                ), 1)
+                WHERE guild_id = ?
+            ''', (guild_id,))
+            updated = cursor.rowcount
+            self._commit()
+            return updated
+        except sqlite3.Error as e:
+            self.logger.error(f"Error recalculating levels: {e}")
+            self._rollback()
+            return 0
+            
+    def flush_activity(self, counts: Dict[tuple, int]):
+        """Add buffered (guild_id, hour_bucket, channel_id, user_id) counts to the hourly rollup"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.executemany('''
+                INSERT INTO activity_hourly (guild_id, bucket, channel_id, user_id, messages)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(guild_id, bucket, channel_id, user_id) DO UPDATE SET
+                    messages = messages + excluded.messages
+            ''', ((*key, count) for key, count in counts.items()))
+            self._commit()
+            return True
+        except sqlite3.Error as e:
+            self.logger.error(f"Error flushing activity: {e}")
+            self._rollback()
+            return False
+            
+    def compact_activity(self, before: int) -> int:
+        """Fold hourly buckets older than `before` (unix seconds, day-aligned) into daily buckets"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute('''
+                INSERT INTO activity_daily (guild_id, bucket, channel_id, user_id, messages)
+                SELECT guild_id, bucket - bucket % 86400, channel_id, user_id, SUM(messages)
+                FROM activity_hourly
+                WHERE bucket < ?
+                GROUP BY guild_id, bucket - bucket % 86400, channel_id, user_id
+                ON CONFLICT(guild_id, bucket, channel_id, user_id) DO UPDATE SET
+                    messages = messages + excluded.messages
+            ''', (before,))
+            cursor.execute('DELETE FROM activity_hourly WHERE bucket < ?', (before,))
+            compacted = cursor.rowcount
+            self._commit()
+            return compacted
+        except sqlite3.Error as e:
+            self.logger.error(f"Error compacting activity: {e}")
+            self._rollback()
+            return 0
+            
+    def get_activity_summary(self, guild_id: int, since: int, limit: int = 5) -> Dict:
+        """Message totals, top channels and top users since a unix timestamp"""
+        rollup = '''
+            SELECT channel_id, user_id, messages FROM activity_hourly
+            WHERE guild_id = :guild_id AND bucket >= :since
+            UNION ALL
+            SELECT channel_id, user_id, messages FROM activity_daily
+            WHERE guild_id = :guild_id AND bucket >= :since - :since % 86400
+        '''
+        params = {'guild_id': guild_id, 'since': since, 'limit': limit}
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f'''
+                SELECT COALESCE(SUM(messages), 0) AS messages,
+                       COUNT(DISTINCT user_id) AS active_users,
+                       COUNT(DISTINCT channel_id) AS active_channels
+                FROM ({rollup})
+            ''', params)
+            summary = dict(cursor.fetchone())
+            
+            for column, key in (('channel_id', 'top_channels'), ('user_id', 'top_users')):
+                cursor.execute(f'''
+                    SELECT {column} AS id, SUM(messages) AS messages
+                    FROM ({rollup})
+                    GROUP BY {column}
+                    ORDER BY messages DESC
+                    LIMIT :limit
+                ''', params)
+                summary[key] = [dict(row) for row in cursor.fetchall()]
+            return summary
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting activity summary: {e}")
+            return {'messages': 0, 'active_users': 0, 'active_channels': 0,
+                    'top_channels': [], 'top_users': []}
+            
+    def get_activity_series(self, guild_id: int, since: int, daily: bool = True) -> List[Dict]:
+        """Messages per day (or per hour, from uncompacted buckets only) since a unix timestamp"""
+        try:
+            cursor = self.connection.cursor()
+            if daily:
+                cursor.execute('''
+                    SELECT bucket, SUM(messages) AS messages FROM (
+                        SELECT bucket - bucket % 86400 AS bucket, messages FROM activity_hourly
+                        WHERE guild_id = :guild_id AND bucket >= :since - :since % 86400
+                        UNION ALL
+                        SELECT bucket, messages FROM activity_daily
+                        WHERE guild_id = :guild_id AND bucket >= :since - :since % 86400
+                    )
+                    GROUP BY bucket
+                    ORDER BY bucket
+                ''', {'guild_id': guild_id, 'since': since})
+            else:
+                cursor.execute('''
+                    SELECT bucket, SUM(messages) AS messages FROM activity_hourly
+                    WHERE guild_id = ? AND bucket >= ?
+                    GROUP BY bucket
+                    ORDER BY bucket
+                ''', (guild_id, since))
+            return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting activity series: {e}")
+            return []
+            
     def get_guild_config(self, guild_id: int) -> Optional[Dict]:
         """Get guild configuration"""
         try:
             cursor = self.connection.cursor()
             cursor.execute('SELECT config_data FROM guild_config WHERE guild_id = ?', (guild_id,))
             row = cursor.fetchone()
-            return json.loads(row['config_data']) if row else None
+            if row is None:
+                return None
+            config = json.loads(row['config_data'])
+            if not isinstance(config, dict):
+                raise ValueError(f"expected a JSON object, got {type(config).__name__}")
+            return config
         except sqlite3.Error as e:
             self.logger.error(f"Error getting guild config: {e}")
             return None
+        except (TypeError, ValueError) as e:
+            # NULL or malformed config_data; callers fall back to the defaults
+            self.logger.error(f"Invalid config stored for guild {guild_id}: {e}")
+            return None
             
     def set_guild_config(self, guild_id: int, config: Dict):
-        """Set guild configuration"""
+        """Set guild configuration overrides"""
         try:
             cursor = self.connection.cursor()
             cursor.execute('''
@@ -212,10 +441,56 @@ class DatabaseManager:
                     updated_at = ?
             ''', (guild_id, json.dumps(config), datetime.now(timezone.utc),
                   json.dumps(config), datetime.now(timezone.utc)))
-            self.connection.commit()
+            self._commit()
         except sqlite3.Error as e:
             self.logger.error(f"Error setting guild config: {e}")
             
+    def set_guild_configs(self, configs: Dict[int, Dict]) -> bool:
+        """Upsert configuration overrides for many guilds in one transaction"""
+        now = datetime.now(timezone.utc)
+        try:
+            cursor = self.connection.cursor()
+            cursor.executemany('''
+                INSERT INTO guild_config (guild_id, config_data, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET
+                    config_data = excluded.config_data,
+                    updated_at = excluded.updated_at
+            ''', ((guild_id, json.dumps(config), now) for guild_id, config in configs.items()))
+            self._commit()
+            return True
+        except sqlite3.Error as e:
+            self.logger.error(f"Error setting guild configs: {e}")
+            self._rollback()
+            return False
+            
+    def reconcile_guild_configs(self, guild_ids: List[int]) -> int:
+        """Create empty override rows for any of these guilds that have none
+        
+        The ids are loaded into a temp table so every missing guild is
+        inserted by one INSERT ... SELECT; existing overrides are untouched.
+        Returns the number of guilds that were added.
+        """
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS joined_guilds (guild_id INTEGER PRIMARY KEY)')
+            cursor.execute('DELETE FROM joined_guilds')
+            cursor.executemany(
+                'INSERT OR IGNORE INTO joined_guilds (guild_id) VALUES (?)',
+                ((guild_id,) for guild_id in guild_ids)
+            )
+            cursor.execute('''
+                INSERT OR IGNORE INTO guild_config (guild_id, config_data)
+                SELECT guild_id, '{}' FROM joined_guilds
+            ''')
+            added = cursor.rowcount
+            self._commit()
+            return added
+        except sqlite3.Error as e:
+            self.logger.error(f"Error reconciling guild configs: {e}")
+            self._rollback()
+            return 0
+            
     def add_warning(self, user_id: int, guild_id: int, moderator_id: int, reason: str):
         """Add a warning to a user"""
         try:
@@ -224,7 +499,7 @@ class DatabaseManager:
                 INSERT INTO user_warnings (user_id, guild_id, moderator_id, reason)
                 VALUES (?, ?, ?, ?)
             ''', (user_id, guild_id, moderator_id, reason))
-            self.connection.commit()
+            self._commit()
             return cursor.lastrowid
         except sqlite3.Error as e:
             self.logger.error(f"Error adding warning: {e}")
@@ -253,10 +528,58 @@ class DatabaseManager:
                 INSERT INTO moderation_logs (guild_id, moderator_id, target_user_id, action_type, reason)
                 VALUES (?, ?, ?, ?, ?)
             ''', (guild_id, moderator_id, target_user_id, action_type, reason))
-            self.connection.commit()
+            self._commit()
         except sqlite3.Error as e:
             self.logger.error(f"Error logging moderation action: {e}")
             
+    def log_moderation_actions(self, actions: List[tuple]) -> bool:
+        """Append buffered (guild_id, moderator_id, target_user_id, action_type, reason, timestamp) rows"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.executemany('''
+                INSERT INTO moderation_logs (guild_id, moderator_id, target_user_id, action_type, reason, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', actions)
+            self._commit()
+            return True
+        except sqlite3.Error as e:
+            self.logger.error(f"Error logging moderation actions: {e}")
+            self._rollback()
+            return False
+            
+    def get_moderation_history(self, guild_id: int, target_user_id: int = None,
+                               moderator_id: int = None, before_id: int = None,
+                               limit: int = 10) -> List[Dict]:
+        """Newest-first moderation history, keyset-paginated on (timestamp, id)
+        
+        Pass the id of the last row of a page as before_id to get the next page.
+        """
+        conditions = ['guild_id = ?']
+        params = [guild_id]
+        if target_user_id is not None:
+            conditions.append('target_user_id = ?')
+            params.append(target_user_id)
+        if moderator_id is not None:
+            conditions.append('moderator_id = ?')
+            params.append(moderator_id)
+        if before_id is not None:
+            conditions.append('(timestamp, id) < (SELECT timestamp, id FROM moderation_logs WHERE id = ?)')
+            params.append(before_id)
+        params.append(limit)
+        
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f'''
+                SELECT * FROM moderation_logs
+                WHERE {' AND '.join(conditions)}
+                ORDER BY timestamp DESC, id DESC
+                LIMIT ?
+            ''', params)
+            return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting moderation history: {e}")
+            return []
+            
     def close(self):
         """Close database connection"""
         if self.connection:
@@ -285,7 +608,9 @@ def setup_database(db_path: str = "revampbot.db"):
         ("event_rsvp", "Event RSVPs"),
         ("moderation_logs", "Moderation action logs"),
         ("user_warnings", "User warnings"),
-        ("custom_commands", "Custom server commands")
+        ("custom_commands", "Custom server commands"),
+        ("activity_hourly", "Hourly message activity rollups"),
+        ("activity_daily", "Daily message activity rollups")
     ]
     
     for table_name, description in tables:
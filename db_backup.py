@@ -0,0 +1,195 @@
+"""
+Database Backup Tool for RevampBot
+Online backups, streaming table exports and bulk imports
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+
+BATCH_SIZE = 10000
+
+
+def backup_database(dest_path, db_path="revampbot.db"):
+    """Take a consistent online backup of the live database
+
+    A backup copied in steps restarts from the first page whenever the bot
+    commits between steps, so under steady writes it never finishes. In WAL
+    mode one read transaction sees a fixed snapshot while the bot keeps
+    writing, so the copy is made in a single pass: VACUUM INTO, which also
+    compacts it, or a one-step backup on SQLite older than 3.27. The copy
+    is written next to dest_path and renamed into place when complete.
+    """
+    tmp_path = dest_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    print(f"\n💾 Backing up {db_path} → {dest_path}")
+    start = time.perf_counter()
+    source = sqlite3.connect(db_path)
+    try:
+        if sqlite3.sqlite_version_info >= (3, 27, 0):
+            source.execute("VACUUM INTO ?", (tmp_path,))
+        else:
+            dest = sqlite3.connect(tmp_path)
+            try:
+                source.backup(dest, pages=-1)
+            finally:
+                dest.close()
+    finally:
+        source.close()
+    os.replace(tmp_path, dest_path)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Backup completed in {elapsed:.2f}s ({os.path.getsize(dest_path)} bytes)")
+
+
+def export_table(table_name, out_path, fmt="jsonl", db_path="revampbot.db", batch_size=BATCH_SIZE):
+    """Stream a table to JSONL or CSV with constant memory"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(f'SELECT * FROM "{table_name}"')
+    columns = [col[0] for col in cursor.description]
+
+    count = 0
+    start = time.perf_counter()
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(columns)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            if fmt == "csv":
+                writer.writerows(rows)
+            else:
+                f.writelines(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows)
+            count += len(rows)
+
+    conn.close()
+    elapsed = time.perf_counter() - start
+    print(f"✅ Exported {count} rows from {table_name} to {out_path} "
+          f"in {elapsed:.2f}s ({count / max(elapsed, 1e-9):,.0f} rows/s)")
+    return count
+
+
+def _read_rows(in_path, fmt):
+    """Yield (columns, row) pairs from a JSONL or CSV export"""
+    with open(in_path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            reader = csv.reader(f)
+            columns = next(reader)
+            for row in reader:
+                # CSV has no NULL, exports write None as an empty field
+                yield columns, [None if value == "" else value for value in row]
+        else:
+            columns = None
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if columns is None:
+                        columns = list(record.keys())
+                    yield columns, [record.get(c) for c in columns]
+
+
+def import_table(table_name, in_path, fmt="jsonl", db_path="revampbot.db", batch_size=BATCH_SIZE):
+    """Bulk import rows in batched transactions, rebuilding indexes afterwards
+
+    The table's indexes are dropped for the duration of the load, so stop
+    the bot first; its queries would otherwise scan the table or see a
+    partial import.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous = OFF")
+    cursor = conn.cursor()
+
+    # Drop the table's secondary indexes while loading; building them once
+    # at the end is much cheaper than maintaining them per insert
+    cursor.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table_name,)
+    )
+    indexes = cursor.fetchall()
+    for name, _ in indexes:
+        cursor.execute(f'DROP INDEX "{name}"')
+    conn.commit()
+
+    count = 0
+    batch = []
+    sql = None
+    start = time.perf_counter()
+    try:
+        for columns, row in _read_rows(in_path, fmt):
+            if sql is None:
+                column_list = ", ".join(f'"{c}"' for c in columns)
+                placeholders = ", ".join("?" for _ in columns)
+                sql = f'INSERT OR REPLACE INTO "{table_name}" ({column_list}) VALUES ({placeholders})'
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                conn.commit()
+                count += len(batch)
+                batch.clear()
+        if batch:
+            cursor.executemany(sql, batch)
+            conn.commit()
+            count += len(batch)
+    except (sqlite3.Error, ValueError) as e:
+        conn.rollback()
+        print(f"❌ Import failed after {count} rows: {e}")
+        return count
+    finally:
+        for _, index_sql in indexes:
+            cursor.execute(index_sql)
+        conn.commit()
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Imported {count} rows into {table_name} from {in_path} "
+          f"in {elapsed:.2f}s ({count / max(elapsed, 1e-9):,.0f} rows/s)")
+    return count
+
+
+def _format_for(path, args):
+    if len(args) > 0:
+        return args[0].lower()
+    return "csv" if path.endswith(".csv") else "jsonl"
+
+
+def main():
+    print("\n🤖 RevampBot Database Backup")
+
+    if len(sys.argv) < 3:
+        print("\n💡 Usage:")
+        print(f"  python {sys.argv[0]} backup <dest.db>                      - Online backup")
+        print(f"  python {sys.argv[0]} export <table> <file> [jsonl|csv]     - Export a table")
+        print(f"  python {sys.argv[0]} import <table> <file> [jsonl|csv]     - Import into a table (stop the bot first)")
+        print("\n  Set DATABASE_PATH to use a database other than revampbot.db")
+        return
+
+    db_path = os.getenv("DATABASE_PATH", "revampbot.db")
+    command = sys.argv[1].lower()
+
+    if command == "backup":
+        backup_database(sys.argv[2], db_path)
+
+    elif command == "export" and len(sys.argv) > 3:
+        export_table(sys.argv[2], sys.argv[3], _format_for(sys.argv[3], sys.argv[4:]), db_path)
+
+    elif command == "import" and len(sys.argv) > 3:
+        import_table(sys.argv[2], sys.argv[3], _format_for(sys.argv[3], sys.argv[4:]), db_path)
+
+    else:
+        print("❌ Invalid command or missing arguments")
+        print("\n💡 Valid commands:")
+        print("  backup <dest>, export <table> <file> [format], import <table> <file> [format]")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
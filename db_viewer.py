@@ -3,122 +3,341 @@ Database Viewer for RevampBot
 View and manage your bot's database
 """
 
+import re
 import sqlite3
 import sys
 
+from database import DatabaseManager
+
+# Representative calls used to capture every query DatabaseManager issues
+QUERY_WORKLOAD = [
+    ("get_user_xp", (1, 1)),
+    ("update_user_xp", (1, 1, 10, 1)),
+    ("get_leaderboard", (1,)),
+    ("recalculate_levels", (1, [0, 100, 400])),
+    ("flush_activity", ({(1, 0, 1, 1): 1},)),
+    ("compact_activity", (0,)),
+    ("get_activity_summary", (1, 0)),
+    ("get_activity_series", (1, 0)),
+    ("get_activity_series", (1, 0, False)),
+    ("get_guild_config", (1,)),
+    ("set_guild_config", (1, {})),
+    ("set_guild_configs", ({1: {}, 2: {"log_channel": 1}},)),
+    ("reconcile_guild_configs", ([1, 2, 3],)),
+    ("add_warning", (1, 1, 1, "reason")),
+    ("get_user_warnings", (1, 1)),
+    ("log_moderation_action", (1, 1, 1, "kick", "reason")),
+    ("log_moderation_actions", ([(1, 1, 1, "kick", "reason", "2024-01-01 00:00:00")],)),
+    ("get_moderation_history", (1,)),
+    ("get_moderation_history", (1, 1, None, 1)),
+    ("get_moderation_history", (1, None, 1, 1)),
+]
+
+def _table_names(cursor):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
+    return [name for (name,) in cursor.fetchall()]
+
+def _check_table(cursor, table_name):
+    """Only allow identifiers that exist in the schema"""
+    if table_name not in _table_names(cursor):
+        raise ValueError(f"Unknown table: {table_name}")
+    return f'"{table_name}"'
+
+def _approximate_counts(cursor):
+    """Row estimates from sqlite_stat1 (populated by ANALYZE), without scanning tables"""
+    try:
+        cursor.execute("SELECT tbl, stat FROM sqlite_stat1")
+    except sqlite3.OperationalError:
+        return {}
+    counts = {}
+    for tbl, stat in cursor.fetchall():
+        # The first number of every stat row is the table's row count
+        counts[tbl] = max(counts.get(tbl, 0), int(stat.split()[0]))
+    return counts
+
+def _object_sizes(cursor):
+    """Bytes per table/index from the dbstat virtual table, if compiled in"""
+    try:
+        cursor.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")
+    except sqlite3.OperationalError:
+        return None
+    return dict(cursor.fetchall())
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
 def view_tables(db_path="revampbot.db"):
-    """Display all tables and their row counts"""
+    """Display all tables with approximate row counts and sizes"""
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
-    
+
     print("\n" + "=" * 70)
     print("🗄️  REVAMPBOT DATABASE OVERVIEW")
     print("=" * 70)
-    
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-    tables = cursor.fetchall()
-    
+
+    tables = _table_names(cursor)
+    counts = _approximate_counts(cursor)
+    sizes = _object_sizes(cursor) or {}
+
     print(f"\n📊 Database: {db_path}")
     print(f"📋 Total Tables: {len(tables)}\n")
-    
-    for (table_name,) in tables:
-        cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-        count = cursor.fetchone()[0]
-        print(f"  ✓ {table_name:25} [{count:>5} rows]")
-    
+
+    for table_name in tables:
+        count = f"~{counts[table_name]}" if table_name in counts else "?"
+        size = _format_bytes(sizes[table_name]) if table_name in sizes else ""
+        print(f"  ✓ {table_name:25} [{count:>9} rows] {size:>10}")
+
+    if not counts:
+        print(f"\n💡 Row counts are estimates from ANALYZE; run `python {sys.argv[0]} analyze` to populate them")
+
     conn.close()
 
+def view_sizes(db_path="revampbot.db"):
+    """Display the on-disk size of every table and index"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    print("\n" + "=" * 70)
+    print("💽 TABLE AND INDEX SIZES")
+    print("=" * 70 + "\n")
+
+    sizes = _object_sizes(cursor)
+    if sizes is None:
+        print("⚠️  This SQLite build has no dbstat support")
+        conn.close()
+        return
+
+    cursor.execute("SELECT name, type, tbl_name FROM sqlite_master WHERE type IN ('table', 'index')")
+    objects = cursor.fetchall()
+
+    print(f"{'Name':<35} {'Type':<8} {'Table':<20} {'Size':>10}")
+    print("-" * 76)
+    for name, type_, tbl_name in sorted(objects, key=lambda o: -sizes.get(o[0], 0)):
+        print(f"{name:<35} {type_:<8} {tbl_name:<20} {_format_bytes(sizes.get(name, 0)):>10}")
+
+    print(f"\n📦 Total: {_format_bytes(sum(sizes.values()))}")
+    conn.close()
+
+def analyze_database(db_path="revampbot.db"):
+    """Refresh sqlite_stat1 so row estimates and query plans are accurate"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    print("✅ Statistics updated")
+
 def view_table_schema(table_name, db_path="revampbot.db"):
     """Display table structure"""
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
-    
+
     print(f"\n" + "=" * 70)
     print(f"📋 TABLE SCHEMA: {table_name}")
     print("=" * 70 + "\n")
-    
-    cursor.execute(f"PRAGMA table_info({table_name})")
+
+    try:
+        cursor.execute(f"PRAGMA table_info({_check_table(cursor, table_name)})")
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        conn.close()
+        return
     columns = cursor.fetchall()
-    
+
     print(f"{'Column':<20} {'Type':<15} {'Not Null':<10} {'Default':<15} {'PK'}")
     print("-" * 70)
-    
+
     for col in columns:
         cid, name, type_, notnull, dflt_value, pk = col
         print(f"{name:<20} {type_:<15} {str(bool(notnull)):<10} {str(dflt_value):<15} {str(bool(pk))}")
-    
+
     conn.close()
 
-def view_table_data(table_name, limit=10, db_path="revampbot.db"):
-    """Display data from a table"""
+def _key_columns(cursor, table):
+    """Columns used for keyset pagination: rowid if the table has one, otherwise its primary key"""
+    try:
+        cursor.execute(f"SELECT rowid FROM {table} LIMIT 0")
+        return ["rowid"]
+    except sqlite3.OperationalError:
+        cursor.execute(f"PRAGMA table_info({table})")
+        pk = sorted((row[5], row[1]) for row in cursor.fetchall() if row[5])
+        return [f'"{name}"' for _, name in pk]
+
+def view_table_data(table_name, limit=10, db_path="revampbot.db", after=None):
+    """Display a page of table data, continuing after the given key"""
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
-    
+
     try:
-        cursor.execute(f"SELECT * FROM {table_name} LIMIT {limit}")
-        rows = cursor.fetchall()
-        
+        table = _check_table(cursor, table_name)
+        keys = _key_columns(cursor, table)
+        key_list = ", ".join(keys)
+
+        # Keyset pagination: seek past the last key instead of using OFFSET
+        params = []
+        where = ""
+        if after is not None:
+            values = after.split(",")
+            if len(values) != len(keys):
+                raise ValueError(f"Expected {len(keys)} key value(s) to continue after")
+            where = f"WHERE ({key_list}) > ({', '.join('?' for _ in keys)})"
+            params.extend(values)
+        params.append(int(limit))
+
+        cursor.execute(
+            f"SELECT {key_list}, * FROM {table} {where} ORDER BY {key_list} LIMIT ?",
+            params
+        )
+
         print(f"\n" + "=" * 70)
-        print(f"📊 TABLE DATA: {table_name} (showing {len(rows)} rows)")
+        print(f"📊 TABLE DATA: {table_name} (page of up to {limit} rows)")
         print("=" * 70 + "\n")
-        
-        if rows:
-            # Print column headers
-            headers = rows[0].keys()
-            header_line = " | ".join(f"{h[:15]:<15}" for h in headers)
-            print(header_line)
-            print("-" * len(header_line))
-            
-            # Print rows
+
+        headers = [col[0] for col in cursor.description][len(keys):]
+        header_line = " | ".join(f"{h[:15]:<15}" for h in headers)
+        print(header_line)
+        print("-" * len(header_line))
+
+        # Stream rows instead of materializing the whole page
+        shown = 0
+        last_key = None
+        while True:
+            rows = cursor.fetchmany(500)
+            if not rows:
+                break
             for row in rows:
                 values = []
-                for key in headers:
-                    val = row[key]
+                for val in tuple(row)[len(keys):]:
                     if val is None:
                         val = "NULL"
                     val_str = str(val)[:15]
                     values.append(f"{val_str:<15}")
                 print(" | ".join(values))
-        else:
+                last_key = tuple(row)[:len(keys)]
+                shown += 1
+
+        if shown == 0:
             print("⚠️  No data in this table")
-            
-    except sqlite3.Error as e:
+        elif shown == int(limit):
+            next_key = ",".join(str(v) for v in last_key)
+            print(f"\n➡️  Next page: python {sys.argv[0]} data {table_name} {limit} {next_key}")
+
+    except (sqlite3.Error, ValueError) as e:
         print(f"❌ Error: {e}")
-    
+
+    conn.close()
+
+def collect_manager_queries():
+    """Run the DatabaseManager workload against a scratch database and capture its SQL"""
+    manager = DatabaseManager(":memory:")
+    manager.connect()
+    manager.initialize_schema()
+
+    statements = []
+    manager.connection.set_trace_callback(statements.append)
+    for method, args in QUERY_WORKLOAD:
+        statements.append(f"-- method {method}")
+        getattr(manager, method)(*args)
+    manager.close()
+
+    queries = []
+    method = None
+    for sql in statements:
+        if sql.startswith("-- method "):
+            method = sql[len("-- method "):]
+            continue
+        if sql.startswith("--"):
+            # Statements SQLite runs internally on our behalf
+            continue
+        queries.append((method, " ".join(sql.split())))
+    return queries
+
+def explain_queries(db_path="revampbot.db"):
+    """Show EXPLAIN QUERY PLAN for every query DatabaseManager issues"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    cursor = conn.cursor()
+
+    print("\n" + "=" * 70)
+    print("🔍 QUERY PLANS FOR DatabaseManager")
+    print("=" * 70)
+
+    seen = set()
+    warnings = 0
+    for method, sql in collect_manager_queries():
+        verb = sql.split(" ", 1)[0].upper()
+        if verb == "CREATE" and "TEMP" in sql.upper():
+            # Recreate temp tables so later statements can be planned
+            cursor.execute(sql)
+            continue
+        # executemany traces one statement per row; plan each shape once
+        shape = re.sub(r"'[^']*'|\b\d+\b", "?", sql)
+        if verb not in ("SELECT", "INSERT", "UPDATE", "DELETE") or shape in seen:
+            continue
+        seen.add(shape)
+
+        print(f"\n▶ {method}: {sql[:100]}{'...' if len(sql) > 100 else ''}")
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        except sqlite3.Error as e:
+            print(f"    ❌ {e}")
+            continue
+        for _, parent, _, detail in cursor.fetchall():
+            # A bare SCAN is a full table scan; temp B-trees mean an unindexed sort/group
+            flagged = (detail.startswith("SCAN") and " USING " not in detail) or "TEMP B-TREE" in detail
+            warnings += flagged
+            print(f"    {'⚠️ ' if flagged else '  '}{detail}")
+
+    print(f"\n{'⚠️ ' if warnings else '✅'} {warnings} potential missing-index warning(s)")
     conn.close()
 
 def main():
     print("\n🤖 RevampBot Database Viewer")
-    
+
     if len(sys.argv) < 2:
         view_tables()
         print("\n💡 Usage:")
-        print(f"  python {sys.argv[0]} tables           - View all tables")
-        print(f"  python {sys.argv[0]} schema <table>   - View table schema")
-        print(f"  python {sys.argv[0]} data <table>     - View table data")
-        print(f"  python {sys.argv[0]} data <table> 20  - View 20 rows")
+        print(f"  python {sys.argv[0]} tables                  - View all tables")
+        print(f"  python {sys.argv[0]} sizes                   - Table and index sizes")
+        print(f"  python {sys.argv[0]} analyze                 - Refresh row estimates")
+        print(f"  python {sys.argv[0]} schema <table>          - View table schema")
+        print(f"  python {sys.argv[0]} data <table>            - View table data")
+        print(f"  python {sys.argv[0]} data <table> 20         - View 20 rows")
+        print(f"  python {sys.argv[0]} data <table> 20 <key>   - View 20 rows after a key")
+        print(f"  python {sys.argv[0]} explain                 - Query plans for the bot's queries")
         return
-    
+
     command = sys.argv[1].lower()
-    
+
     if command == "tables":
         view_tables()
-    
+
+    elif command == "sizes":
+        view_sizes()
+
+    elif command == "analyze":
+        analyze_database()
+
+    elif command == "explain":
+        explain_queries()
+
     elif command == "schema" and len(sys.argv) > 2:
         table_name = sys.argv[2]
         view_table_schema(table_name)
-    
+
     elif command == "data" and len(sys.argv) > 2:
         table_name = sys.argv[2]
         limit = int(sys.argv[3]) if len(sys.argv) > 3 else 10
-        view_table_data(table_name, limit)
-    
+        after = sys.argv[4] if len(sys.argv) > 4 else None
+        view_table_data(table_name, limit, after=after)
+
     else:
         print("❌ Invalid command or missing arguments")
         print("\n💡 Valid commands:")
-        print("  tables, schema <table>, data <table> [limit]")
-    
+        print("  tables, sizes, analyze, explain, schema <table>, data <table> [limit] [after]")
+
     print()
 
 if __name__ == "__main__":
@@ -6,16 +6,22 @@ import discord
 from discord.ext import commands, tasks
 from discord.utils import get
 import asyncio
-import sqlite3
-import json
 import logging
 import os
 import random
+import signal
+import time
 import datetime
 from dotenv import load_dotenv
 from typing import Optional, List, Dict, Any
-import aiohttp
 from dataclasses import dataclass
+from database import DatabaseManager
+from http_client import HttpClient, RateLimited, github_repo_api_url
+from lifecycle import LifecycleManager
+from scheduler import CommandScheduler
+from member_cache import MemberLRU, client_cache_options
+from guild_config import config_diff, default_config, merge_config
+from profiler import Profiler
 
 # Load environment variables
 load_dotenv()
@@ -28,6 +34,26 @@ class BotConfig:
     log_level: str = "INFO"
     max_xp_per_message: int = 5
     cooldown_seconds: int = 5
+    welcome_batch_threshold: int = 5
+    welcome_batch_interval: int = 10
+    role_queue_size: int = 1000
+    role_queue_workers: int = 2
+    role_assign_rate: float = 2.0
+    analytics_flush_interval: int = 60
+    analytics_hourly_retention_days: int = 7
+    http_pool_size: int = 64
+    http_per_host_limit: int = 8
+    http_cache_ttl: int = 300
+    checkpoint_path: str = "revampbot.checkpoint"
+    shutdown_drain_timeout: float = 10.0
+    command_concurrency: int = 16
+    command_queue_size: int = 500
+    command_guild_queue_size: int = 20
+    memory_profile: str = "full"
+    member_lru_size: int = 10000
+    profile_on_start: bool = False
+    profile_mode: str = "sample"
+    profile_dir: str = "profiles"
     
     @classmethod
     def from_env(cls):
@@ -36,7 +62,27 @@ class BotConfig:
             database_path=os.getenv('DATABASE_PATH', 'revampbot.db'),
             log_level=os.getenv('LOG_LEVEL', 'INFO'),
             max_xp_per_message=int(os.getenv('MAX_XP_PER_MESSAGE', '5')),
-            cooldown_seconds=int(os.getenv('COOLDOWN_SECONDS', '5'))
+            cooldown_seconds=int(os.getenv('COOLDOWN_SECONDS', '5')),
+            welcome_batch_threshold=int(os.getenv('WELCOME_BATCH_THRESHOLD', '5')),
+            welcome_batch_interval=int(os.getenv('WELCOME_BATCH_INTERVAL', '10')),
+            role_queue_size=int(os.getenv('ROLE_QUEUE_SIZE', '1000')),
+            role_queue_workers=int(os.getenv('ROLE_QUEUE_WORKERS', '2')),
+            role_assign_rate=float(os.getenv('ROLE_ASSIGN_RATE', '2.0')),
+            analytics_flush_interval=int(os.getenv('ANALYTICS_FLUSH_INTERVAL', '60')),
+            analytics_hourly_retention_days=int(os.getenv('ANALYTICS_HOURLY_RETENTION_DAYS', '7')),
+            http_pool_size=int(os.getenv('HTTP_POOL_SIZE', '64')),
+            http_per_host_limit=int(os.getenv('HTTP_PER_HOST_LIMIT', '8')),
+            http_cache_ttl=int(os.getenv('HTTP_CACHE_TTL', '300')),
+            checkpoint_path=os.getenv('CHECKPOINT_PATH', 'revampbot.checkpoint'),
+            shutdown_drain_timeout=float(os.getenv('SHUTDOWN_DRAIN_TIMEOUT', '10')),
+            command_concurrency=int(os.getenv('COMMAND_CONCURRENCY', '16')),
+            command_queue_size=int(os.getenv('COMMAND_QUEUE_SIZE', '500')),
+            command_guild_queue_size=int(os.getenv('COMMAND_GUILD_QUEUE_SIZE', '20')),
+            memory_profile=os.getenv('MEMORY_PROFILE', 'full').lower(),
+            member_lru_size=int(os.getenv('MEMBER_LRU_SIZE', '10000')),
+            profile_on_start=os.getenv('PROFILE', '0').lower() in ('1', 'true', 'yes'),
+            profile_mode=os.getenv('PROFILE_MODE', 'sample'),
+            profile_dir=os.getenv('PROFILE_DIR', 'profiles')
         )
 
 # Enhanced Bot Class
@@ -50,11 +96,13 @@ class EnhancedRevampBot(commands.Bot):
         super().__init__(
             command_prefix=config.prefix,
             intents=intents,
-            help_command=None  # We'll create a custom help command
+            help_command=None,  # We'll create a custom help command
+            **client_cache_options(config.memory_profile)
         )
         
         self.config = config
         self.start_time = datetime.datetime.now(datetime.timezone.utc)
+        self.start_perf = time.perf_counter()
         
         # Setup logging
         self.setup_logging()
@@ -65,8 +113,36 @@ class EnhancedRevampBot(commands.Bot):
         # Load server configurations
         self.server_configs = {}
         
-        # Session for HTTP requests
-        self.session: Optional[aiohttp.ClientSession] = None
+        # Recently active members, used when the member cache is trimmed
+        self.member_cache = MemberLRU(config.member_lru_size if config.memory_profile != 'full' else 0)
+        if self.member_cache.max_size:
+            self._track_member_updates()
+        
+        # Drains work and checkpoints hot caches across restarts
+        self.lifecycle = LifecycleManager(
+            self.database,
+            checkpoint_path=config.checkpoint_path,
+            drain_timeout=config.shutdown_drain_timeout
+        )
+        self.shutdown_task: Optional[asyncio.Task] = None
+        
+        # Fair, prioritized execution of commands across guilds
+        self.scheduler = CommandScheduler(
+            max_concurrency=config.command_concurrency,
+            max_queue=config.command_queue_size,
+            max_guild_queue=config.command_guild_queue_size
+        )
+        
+        # On-demand command/event profiler
+        self.profiler = Profiler(output_dir=config.profile_dir)
+        
+        # Shared client for outbound HTTP lookups
+        self.http_client = HttpClient(
+            total_limit=config.http_pool_size,
+            per_host_limit=config.http_per_host_limit,
+            host_limits={'api.github.com': 4},
+            cache_ttl=config.http_cache_ttl
+        )
         
     def setup_logging(self):
         """Setup enhanced logging system"""
@@ -84,48 +160,10 @@ class EnhancedRevampBot(commands.Bot):
     def init_database(self):
         """Initialize SQLite database with proper schema"""
         try:
-            self.db = sqlite3.connect(self.config.database_path)
-            self.db.execute('''
-                CREATE TABLE IF NOT EXISTS user_xp (
-                    user_id INTEGER,
-                    guild_id INTEGER,
-                    xp INTEGER DEFAULT 0,
-                    level INTEGER DEFAULT 1,
-                    last_message TIMESTAMP,
-                    PRIMARY KEY (user_id, guild_id)
-                )
-            ''')
-            
-            self.db.execute('''
-                CREATE TABLE IF NOT EXISTS guild_config (
-                    guild_id INTEGER PRIMARY KEY,
-                    config_data TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            self.db.execute('''
-                CREATE TABLE IF NOT EXISTS showcase_projects (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    guild_id INTEGER,
-                    project_name TEXT,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            self.db.execute('''
-                CREATE TABLE IF NOT EXISTS event_rsvp (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    guild_id INTEGER,
-                    event_name TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            self.db.commit()
+            self.database = DatabaseManager(self.config.database_path)
+            self.database.connect()
+            self.database.initialize_schema()
+            self.db = self.database.connection
             self.logger.info("Database initialized successfully")
             
         except Exception as e:
@@ -133,7 +171,23 @@ class EnhancedRevampBot(commands.Bot):
             
     async def setup_hook(self):
         """Setup hook called when bot starts"""
-        self.session = aiohttp.ClientSession()
+        await self.http_client.start()
+        
+        # Reload the previous run's caches before cogs register their state
+        self.lifecycle.load_checkpoint()
+        self.lifecycle.register('bot', self)
+        
+        self.scheduler.start()
+        self.lifecycle.register('scheduler', self.scheduler)
+        
+        if self.config.profile_on_start:
+            self.profiler.start(self.config.profile_mode)
+        
+        # Shut down gracefully when the host stops the process (e.g. on redeploy)
+        try:
+            self.loop.add_signal_handler(signal.SIGTERM, self._on_sigterm)
+        except (NotImplementedError, RuntimeError):
+            pass
         
         # Add CoreCommands cog
         await self.add_cog(CoreCommands(self))
@@ -146,11 +200,18 @@ class EnhancedRevampBot(commands.Bot):
         
         self.logger.info("Bot setup completed successfully")
         
+    def _on_sigterm(self):
+        # Hold the task so it isn't garbage collected halfway through the drain
+        if self.shutdown_task is None:
+            self.shutdown_task = asyncio.create_task(self.close())
+            
     async def load_cogs(self):
         """Load all bot cogs/extensions"""
         cogs = [
             'cogs.moderation',
-            # 'cogs.leveling',
+            'cogs.welcome',
+            'cogs.leveling',
+            'cogs.analytics',
             # 'cogs.events',
             # 'cogs.community',
             # 'cogs.utility'
@@ -163,11 +224,44 @@ class EnhancedRevampBot(commands.Bot):
             except Exception as e:
                 self.logger.error(f"Failed to load cog {cog}: {e}")
                 
+    async def invoke(self, ctx):
+        """Run commands through the scheduler instead of as unbounded tasks"""
+        if ctx.command is None:
+            return await super().invoke(ctx)
+        await self.scheduler.submit(ctx, self._timed_invoke)
+        
+    async def _timed_invoke(self, ctx):
+        if not self.profiler.active:
+            return await super().invoke(ctx)
+        await self.profiler.timed(f"command {ctx.command.qualified_name}", super().invoke(ctx))
+        
+    async def _run_event(self, coro, event_name, *args, **kwargs):
+        # discord.py awaits this once per handler for every dispatched event
+        if not self.profiler.active:
+            return await super()._run_event(coro, event_name, *args, **kwargs)
+        handler = getattr(coro, '__qualname__', event_name)
+        await self.profiler.timed(
+            f"event {event_name} → {handler}",
+            super()._run_event(coro, event_name, *args, **kwargs)
+        )
+        
     async def on_ready(self):
         """Called when bot is ready"""
         self.logger.info(f'{self.user} has connected to Discord!')
         self.logger.info(f'Connected to {len(self.guilds)} guilds')
+        self.logger.info(
+            f"Ready in {time.perf_counter() - self.start_perf:.2f}s "
+            f"({'warm' if self.lifecycle.warm_start else 'cold'} start)"
+        )
         
+        # Catch up on guilds joined while the bot was offline
+        start = time.perf_counter()
+        added = self.database.reconcile_guild_configs([guild.id for guild in self.guilds])
+        if added:
+            self.logger.info(
+                f"Reconciled config for {added} new guilds in {time.perf_counter() - start:.2f}s"
+            )
+            
         # Set bot presence
         await self.change_presence(
             activity=discord.Activity(
@@ -176,6 +270,30 @@ class EnhancedRevampBot(commands.Bot):
             )
         )
         
+    async def on_message(self, message):
+        """Track active members, then process commands"""
+        if isinstance(message.author, discord.Member):
+            self.member_cache.put(message.author)
+        await self.process_commands(message)
+        
+    async def on_member_join(self, member):
+        self.member_cache.put(member)
+        
+    def _track_member_updates(self):
+        """Keep LRU members current; discord.py has no raw member-update event"""
+        parsers = self._connection.parsers
+        parse_member_update = parsers['GUILD_MEMBER_UPDATE']
+        
+        def parse(data):
+            parse_member_update(data)
+            self.member_cache.update(int(data['guild_id']), data)
+            
+        parsers['GUILD_MEMBER_UPDATE'] = parse
+        
+    async def on_raw_member_remove(self, payload):
+        # Raw event, so it fires even for members that were never cached
+        self.member_cache.discard(payload.guild_id, payload.user.id)
+        
     async def on_guild_join(self, guild):
         """Called when bot joins a new guild"""
         self.logger.info(f"Joined new guild: {guild.name} (ID: {guild.id})")
@@ -183,27 +301,49 @@ class EnhancedRevampBot(commands.Bot):
         # Create default configuration for new guild
         await self.create_default_guild_config(guild)
         
+    def default_guild_config(self) -> Dict[str, Any]:
+        """Default configuration for a guild"""
+        return default_config()
+        
+    def get_guild_config(self, guild_id: int) -> Dict[str, Any]:
+        """Get a guild's configuration, cached in memory after the first read"""
+        config = self.server_configs.get(guild_id)
+        if config is not None:
+            return config
+            
+        # Only overrides are stored; older rows holding a full config merge the same way
+        overrides = self.database.get_guild_config(guild_id) or {}
+        config = merge_config(self.default_guild_config(), overrides)
+        self.server_configs[guild_id] = config
+        return config
+        
+    def save_guild_config(self, guild_id: int, config: Dict[str, Any]):
+        """Persist a guild's overrides and refresh the cache"""
+        self.database.set_guild_config(guild_id, config_diff(self.default_guild_config(), config))
+        self.server_configs[guild_id] = config
+        
+    def save_guild_configs(self, configs: Dict[int, Dict[str, Any]]) -> bool:
+        """Persist many guilds' overrides in one transaction and refresh the cache"""
+        defaults = self.default_guild_config()
+        diffs = {guild_id: config_diff(defaults, config) for guild_id, config in configs.items()}
+        if not self.database.set_guild_configs(diffs):
+            return False
+        self.server_configs.update(configs)
+        return True
+        
+    def snapshot(self) -> Dict[str, Any]:
+        """Hot caches saved to the restart checkpoint"""
+        return {'server_configs': self.server_configs}
+        
+    def restore(self, state: Dict[str, Any]):
+        """Reload caches from the restart checkpoint"""
+        self.server_configs.update(state.get('server_configs', {}))
+        
     async def create_default_guild_config(self, guild):
         """Create default configuration for a new guild"""
-        default_config = {
-            'auto_setup': False,  # Changed from destructive auto-setup
-            'welcome_channel': None,
-            'log_channel': None,
-            'level_up_notifications': True,
-            'auto_roles': [],
-            'moderation': {
-                'auto_mod': False,
-                'spam_detection': True,
-                'invite_filtering': False
-            }
-        }
-        
         try:
-            self.db.execute(
-                'INSERT OR REPLACE INTO guild_config (guild_id, config_data) VALUES (?, ?)',
-                (guild.id, json.dumps(default_config))
-            )
-            self.db.commit()
+            # Defaults aren't stored per guild, and a rejoining guild keeps its overrides
+            self.database.reconcile_guild_configs([guild.id])
             
             # Send welcome message to system channel if available
             if guild.system_channel:
@@ -261,11 +401,16 @@ class EnhancedRevampBot(commands.Bot):
             
     async def close(self):
         """Cleanup when bot shuts down"""
-        if self.session:
-            await self.session.close()
+        if self.profiler.active:
+            self.profiler.stop()
+        
+        # Drain and flush while the DB and gateway are still available
+        await self.lifecycle.shutdown()
+        await super().close()
+        await self.scheduler.stop()
+        await self.http_client.close()
         if hasattr(self, 'db'):
             self.db.close()
-        await super().close()
         self.logger.info("Bot shutdown completed")
 
 # Core Commands (moved to main bot class for essential functionality)
@@ -289,6 +434,7 @@ class CoreCommands(commands.Cog):
                 f"`{self.bot.config.prefix}help` - Show this help message\n"
                 f"`{self.bot.config.prefix}ping` - Check bot latency\n"
                 f"`{self.bot.config.prefix}info` - Bot information\n"
+                f"`{self.bot.config.prefix}repo <url>` - Preview a GitHub repository\n"
                 f"`{self.bot.config.prefix}setup` - Server setup wizard"
             ),
             inline=False
@@ -338,8 +484,118 @@ class CoreCommands(commands.Cog):
         
         await ctx.send(embed=embed)
 
+    @commands.command(name='repo')
+    async def repo_preview(self, ctx, url: str):
+        """Preview a GitHub repository"""
+        api_url = github_repo_api_url(url)
+        if not api_url:
+            await ctx.send("❌ Please provide a GitHub repository URL, e.g. https://github.com/owner/repo")
+            return
+            
+        try:
+            repo = await self.bot.http_client.get_json(
+                api_url, headers={'Accept': 'application/vnd.github+json'}
+            )
+        except RateLimited as e:
+            await ctx.send(f"⏳ GitHub is rate limiting us, try again in {int(e.retry_after // 60) + 1} min.")
+            return
+        if not isinstance(repo, dict):
+            await ctx.send("❌ Couldn't fetch that repository.")
+            return
+            
+        embed = discord.Embed(
+            title=repo.get('full_name', url),
+            url=repo.get('html_url', url),
+            description=repo.get('description') or "No description provided.",
+            color=discord.Color.dark_grey()
+        )
+        embed.add_field(name="⭐ Stars", value=repo.get('stargazers_count', 0), inline=True)
+        embed.add_field(name="🍴 Forks", value=repo.get('forks_count', 0), inline=True)
+        embed.add_field(name="Language", value=repo.get('language') or "Unknown", inline=True)
+        await ctx.send(embed=embed)
+
+    @commands.command(name='queue')
+    @commands.is_owner()
+    async def queue_stats(self, ctx):
+        """Show command scheduler load and queue-wait latency (owner only)"""
+        metrics = self.bot.scheduler.metrics()
+        embed = discord.Embed(title="🚦 Command Scheduler", color=discord.Color.blue())
+        embed.add_field(name="Running", value=metrics['running'], inline=True)
+        embed.add_field(
+            name="Queued",
+            value=", ".join(f"{name}: {count}" for name, count in metrics['queued'].items()),
+            inline=True
+        )
+        embed.add_field(name="Shed", value=metrics['shed'], inline=True)
+        for name, latency in metrics['wait_ms'].items():
+            embed.add_field(
+                name=f"Wait ({name})",
+                value=f"p50 {latency['p50']:.1f}ms · p95 {latency['p95']:.1f}ms · p99 {latency['p99']:.1f}ms",
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
+    @commands.group(name='profile', invoke_without_command=True)
+    @commands.is_owner()
+    async def profile(self, ctx):
+        """Profile command and event handlers (owner only)"""
+        state = "running" if self.bot.profiler.active else "stopped"
+        await ctx.send(
+            f"Profiler is {state}. Use `{self.bot.config.prefix}profile start [sample|cprofile] [seconds]` "
+            f"or `{self.bot.config.prefix}profile stop`."
+        )
+
+    @profile.command(name='start')
+    @commands.is_owner()
+    async def profile_start(self, ctx, mode: str = 'sample', seconds: Optional[int] = None):
+        """Start profiling, optionally stopping after a window"""
+        if self.bot.profiler.active:
+            await ctx.send("⚠️ Profiler is already running.")
+            return
+        try:
+            self.bot.profiler.start(mode)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        await ctx.send(f"🔬 Profiler started ({mode} mode).")
+        
+        # Stop from a background task so the command doesn't hold a scheduler slot for the window
+        if seconds:
+            self.bot.profiler.stop_after(seconds, lambda: self._send_profile_report(ctx))
+
+    @profile.command(name='stop')
+    @commands.is_owner()
+    async def profile_stop(self, ctx):
+        """Stop profiling and write the results"""
+        if not self.bot.profiler.active:
+            await ctx.send("⚠️ Profiler is not running.")
+            return
+        await self._send_profile_report(ctx)
+
+    async def _send_profile_report(self, ctx):
+        paths = self.bot.profiler.stop()
+        handlers, slow = self.bot.profiler.report(limit=8)
+        
+        embed = discord.Embed(title="🔬 Profile Results", color=discord.Color.blue())
+        embed.add_field(
+            name="Slowest Handlers (total)",
+            value='\n'.join(
+                f"`{name[:50]}` {stats.calls}x, {stats.total * 1000:.0f}ms (max {stats.max * 1000:.0f}ms)"
+                for name, stats in handlers
+            ) or "No handlers ran.",
+            inline=False
+        )
+        if slow:
+            embed.add_field(
+                name="⚠️ Loop-Blocking Calls",
+                value='\n'.join(f"`{culprit[:80]}` worst {stats.max * 1000:.0f}ms" for culprit, stats in slow[:5]),
+                inline=False
+            )
+        embed.set_footer(text=f"Written to {', '.join(paths)}")
+        await ctx.send(embed=embed)
+
     # Safe setup command (replaces destructive server wipe)
-    @commands.command(name='setup')
+    @commands.command(name='setup', extras={'priority': 'low', 'concurrency': 2})
     @commands.has_permissions(administrator=True)
     async def setup_server(self, ctx):
         """Safe server setup wizard"""
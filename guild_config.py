@@ -0,0 +1,56 @@
+"""
+Guild Configuration for RevampBot
+Defaults are defined once here; each guild only stores the settings it
+overrides, as a sparse diff against these defaults
+"""
+
+import copy
+from typing import Any, Dict
+
+DEFAULT_GUILD_CONFIG: Dict[str, Any] = {
+    'auto_setup': False,  # Changed from destructive auto-setup
+    'welcome_channel': None,
+    'log_channel': None,
+    'level_up_notifications': True,
+    'auto_roles': [],
+    'moderation': {
+        'auto_mod': False,
+        'spam_detection': True,
+        'invite_filtering': False
+    }
+}
+
+
+def default_config() -> Dict[str, Any]:
+    """A fresh copy of the defaults that callers are free to mutate"""
+    return copy.deepcopy(DEFAULT_GUILD_CONFIG)
+
+
+def merge_config(defaults: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply sparse overrides on top of the defaults, recursing into nested sections"""
+    merged = copy.deepcopy(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def config_diff(defaults: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    """The settings in config that differ from the defaults
+
+    Nested sections are diffed key by key, so changing one moderation
+    setting stores just that setting. merge_config(defaults, diff)
+    reproduces config.
+    """
+    diff = {}
+    for key, value in config.items():
+        default = defaults.get(key)
+        if isinstance(value, dict) and isinstance(default, dict):
+            nested = config_diff(default, value)
+            if nested:
+                diff[key] = nested
+        elif key not in defaults or value != default:
+            diff[key] = value
+    return diff
@@ -0,0 +1,266 @@
+"""
+Shared HTTP Client for RevampBot
+Pooled connections, response caching and per-host rate limiting
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDict
+
+
+GITHUB_NAME = re.compile(r'[A-Za-z0-9_.-]+')
+
+
+class RateLimited(Exception):
+    """The host's rate-limit window resets further away than we're willing to wait"""
+
+    def __init__(self, url: str, retry_after: float):
+        super().__init__(f"Rate limited for {retry_after:.0f}s: {url}")
+        self.url = url
+        self.retry_after = retry_after
+
+
+@dataclass
+class HttpResponse:
+    """A fully read response that can be cached and shared between callers"""
+    status: int
+    body: bytes
+    headers: Mapping[str, str]
+    url: str
+    from_cache: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def json(self):
+        return json.loads(self.body)
+
+
+@dataclass
+class CacheEntry:
+    response: HttpResponse
+    expires: float
+    etag: Optional[str] = None
+
+
+@dataclass
+class HostLimits:
+    """Concurrency cap plus the server-reported rate-limit window for one host"""
+    semaphore: asyncio.Semaphore
+    blocked_until: float = 0.0
+
+
+class ResponseCache:
+    """TTL + LRU cache of GET responses keyed by URL"""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        entry = self.entries.get(url)
+        if entry is not None:
+            self.entries.move_to_end(url)
+        return entry
+
+    def put(self, url: str, response: HttpResponse, ttl: Optional[float] = None):
+        self.entries[url] = CacheEntry(
+            response=response,
+            expires=time.monotonic() + (self.ttl if ttl is None else ttl),
+            etag=response.headers.get('ETag')
+        )
+        self.entries.move_to_end(url)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class HttpClient:
+    """Shared client for outbound lookups (GitHub previews, etc.)"""
+
+    def __init__(self, total_limit: int = 64, per_host_limit: int = 8,
+                 host_limits: Optional[Dict[str, int]] = None,
+                 cache_entries: int = 512, cache_ttl: float = 300.0,
+                 timeout: float = 10.0, max_rate_limit_wait: float = 5.0,
+                 user_agent: str = "RevampBot (discord bot)"):
+        self.total_limit = total_limit
+        self.per_host_limit = per_host_limit
+        self.host_limit_overrides = host_limits or {}
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.user_agent = user_agent
+        self.cache = ResponseCache(cache_entries, cache_ttl)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.hosts: Dict[str, HostLimits] = {}
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.logger = logging.getLogger('RevampBot.HTTP')
+        self.stats = {'requests': 0, 'coalesced': 0, 'revalidated': 0, 'rate_limited': 0}
+
+    async def start(self):
+        """Create the pooled session"""
+        connector = aiohttp.TCPConnector(
+            limit=self.total_limit,
+            limit_per_host=self.per_host_limit,
+            ttl_dns_cache=300,
+            keepalive_timeout=30
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={'User-Agent': self.user_agent}
+        )
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def _host(self, url: str) -> HostLimits:
+        host = urlsplit(url).hostname or ''
+        limits = self.hosts.get(host)
+        if limits is None:
+            cap = self.host_limit_overrides.get(host, self.per_host_limit)
+            limits = self.hosts[host] = HostLimits(asyncio.Semaphore(cap))
+        return limits
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+                  ttl: Optional[float] = None) -> HttpResponse:
+        """GET a URL through the cache, coalescing identical in-flight requests"""
+        entry = self.cache.get(url)
+        if entry is not None and entry.expires > time.monotonic():
+            self.cache.hits += 1
+            return replace(entry.response, from_cache=True)
+        self.cache.misses += 1
+
+        pending = self.in_flight.get(url)
+        if pending is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[url] = future
+        try:
+            try:
+                response = await self._fetch(url, headers or {}, entry, ttl)
+            except RateLimited:
+                if entry is None:
+                    raise
+                # A stale copy beats no answer while the window is closed
+                response = replace(entry.response, from_cache=True)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so waiter-less failures aren't reported as unhandled
+            future.exception()
+            raise
+        finally:
+            del self.in_flight[url]
+
+    async def get_json(self, url: str, **kwargs):
+        """GET a URL and decode it as JSON; None for errors, non-2xx statuses and non-JSON bodies
+
+        Raises RateLimited when the host's rate-limit window is closed and
+        nothing is cached, so callers can tell the user to try again later.
+        """
+        try:
+            response = await self.get(url, **kwargs)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.error(f"GET {url} failed: {e}")
+            return None
+        if not response.ok:
+            self.logger.warning(f"GET {url} returned {response.status}")
+            return None
+        try:
+            return response.json()
+        except ValueError as e:
+            self.logger.warning(f"GET {url} returned a non-JSON body: {e}")
+            return None
+
+    async def _fetch(self, url: str, headers: Dict[str, str],
+                     stale: Optional[CacheEntry], ttl: Optional[float]) -> HttpResponse:
+        if self.session is None:
+            await self.start()
+
+        if stale is not None and stale.etag:
+            headers = {**headers, 'If-None-Match': stale.etag}
+
+        limits = self._host(url)
+        # Respect the window the server told us about, but don't park the
+        # caller (and its scheduler slot) until a distant reset
+        delay = limits.blocked_until - time.time()
+        if delay > 0:
+            self.stats['rate_limited'] += 1
+            if delay > self.max_rate_limit_wait:
+                raise RateLimited(url, delay)
+            await asyncio.sleep(delay)
+
+        async with limits.semaphore:
+            self.stats['requests'] += 1
+            async with self.session.get(url, headers=headers) as resp:
+                body = await resp.read()
+                response = HttpResponse(resp.status, body, CIMultiDict(resp.headers), str(resp.url))
+
+        self._update_rate_limit(limits, response)
+
+        if response.status == 304 and stale is not None:
+            self.stats['revalidated'] += 1
+            self.cache.put(url, stale.response, ttl)
+            return replace(stale.response, from_cache=True)
+
+        if response.status == 200:
+            self.cache.put(url, response, ttl)
+        return response
+
+    def _update_rate_limit(self, limits: HostLimits, response: HttpResponse):
+        """Track X-RateLimit-* / Retry-After headers (GitHub and most APIs use these)"""
+        headers = response.headers
+        try:
+            if response.status == 429 and 'Retry-After' in headers:
+                limits.blocked_until = time.time() + float(headers['Retry-After'])
+            elif headers.get('X-RateLimit-Remaining') == '0' and 'X-RateLimit-Reset' in headers:
+                limits.blocked_until = float(headers['X-RateLimit-Reset'])
+        except ValueError:
+            pass
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            'cache_entries': len(self.cache),
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+            'in_flight': len(self.in_flight)
+        }
+
+
+def github_repo_api_url(url: str) -> Optional[str]:
+    """Map https://github.com/<owner>/<repo>[...] to its REST API URL"""
+    parts = urlsplit(url)
+    if parts.hostname not in ('github.com', 'www.github.com'):
+        return None
+    segments = [s for s in parts.path.split('/') if s]
+    if len(segments) < 2:
+        return None
+    owner, repo = segments[0], segments[1]
+    if repo.endswith('.git'):
+        repo = repo[:-4]
+    # Anything else could walk the API path, e.g. github.com/../users/x
+    for name in (owner, repo):
+        if not GITHUB_NAME.fullmatch(name) or name in ('.', '..'):
+            return None
+    return f"https://api.github.com/repos/{owner}/{repo}"
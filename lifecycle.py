@@ -0,0 +1,169 @@
+"""
+Lifecycle Manager for RevampBot
+Drains queues and flushes buffers on shutdown, and checkpoints hot caches
+so a restart comes back warm
+"""
+
+import asyncio
+import logging
+import marshal
+import os
+import sys
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+CHECKPOINT_MAGIC = b"RVCK"
+CHECKPOINT_VERSION = 1
+
+
+class LifecycleManager:
+    """Coordinates shutdown and warm start for registered components
+
+    A component is any object registered under a name that implements some of:
+        async drain(timeout)  - finish queued work before the deadline
+        flush()               - write buffered state via DatabaseManager methods,
+                                returning what it took from its buffers
+        restore_pending(data) - put back what flush() returned if the
+                                shutdown transaction is rolled back
+        snapshot() -> dict    - hot cache contents for the checkpoint
+        restore(state)        - reload what snapshot() returned
+    State must be built from plain values (dicts, lists, tuples, numbers,
+    strings) so it can be serialized with marshal.
+    """
+
+    def __init__(self, database, checkpoint_path: Optional[str] = None,
+                 drain_timeout: float = 10.0, max_checkpoint_age: float = 3600.0):
+        self.database = database
+        self.checkpoint_path = checkpoint_path
+        self.drain_timeout = drain_timeout
+        self.max_checkpoint_age = max_checkpoint_age
+        self.components: Dict[str, Any] = {}
+        self.checkpoint: Dict[str, Any] = {}
+        self.warm_start = False
+        self.shutting_down = False
+        self.logger = logging.getLogger('RevampBot.Lifecycle')
+
+    def register(self, name: str, component):
+        """Register a component, restoring its checkpointed state if available"""
+        self.components[name] = component
+        state = self.checkpoint.pop(name, None)
+        if state is not None and hasattr(component, 'restore'):
+            try:
+                component.restore(state)
+            except Exception as e:
+                self.logger.error(f"Failed to restore checkpoint for {name}: {e}")
+
+    def unregister(self, name: str):
+        self.components.pop(name, None)
+
+    def load_checkpoint(self) -> bool:
+        """Read the checkpoint written by the previous shutdown, if it's usable"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return False
+
+        start = time.perf_counter()
+        try:
+            with open(self.checkpoint_path, 'rb') as f:
+                data = f.read()
+            if data[:4] != CHECKPOINT_MAGIC:
+                raise ValueError("not a checkpoint file")
+            version, py_major, py_minor = data[4], data[5], data[6]
+            # marshal's format is only stable within a Python version
+            if (version, py_major, py_minor) != (CHECKPOINT_VERSION, *sys.version_info[:2]):
+                raise ValueError("written by a different bot or Python version")
+            payload = marshal.loads(zlib.decompress(data[7:]))
+            age = time.time() - payload['written_at']
+            if age > self.max_checkpoint_age:
+                raise ValueError(f"too old ({age:.0f}s)")
+        except (OSError, ValueError, EOFError, TypeError, KeyError, zlib.error) as e:
+            self.logger.warning(f"Ignoring checkpoint {self.checkpoint_path}: {e}")
+            return False
+        finally:
+            # A checkpoint is only valid for the restart right after it was written
+            try:
+                os.remove(self.checkpoint_path)
+            except OSError:
+                pass
+
+        self.checkpoint = payload['components']
+        self.warm_start = True
+        elapsed = (time.perf_counter() - start) * 1000
+        self.logger.info(f"Loaded checkpoint ({len(data)} bytes) in {elapsed:.1f}ms")
+        return True
+
+    def write_checkpoint(self):
+        """Snapshot every component's hot caches to a compact binary file"""
+        if not self.checkpoint_path:
+            return
+
+        components = {}
+        for name, component in self.components.items():
+            if hasattr(component, 'snapshot'):
+                try:
+                    components[name] = component.snapshot()
+                except Exception as e:
+                    self.logger.error(f"Failed to snapshot {name}: {e}")
+
+        payload = {'written_at': time.time(), 'components': components}
+        header = CHECKPOINT_MAGIC + bytes((CHECKPOINT_VERSION, *sys.version_info[:2]))
+        data = header + zlib.compress(marshal.dumps(payload))
+
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.checkpoint_path)
+            self.logger.info(f"Wrote checkpoint ({len(data)} bytes) to {self.checkpoint_path}")
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Failed to write checkpoint: {e}")
+
+    def _flush_all(self, flushers):
+        """Flush every component in one transaction, or each on its own if that fails"""
+        taken = []
+        try:
+            with self.database.transaction():
+                for name, component in flushers:
+                    taken.append((name, component, component.flush()))
+            return
+        except Exception as e:
+            self.logger.error(f"Shared shutdown flush failed, flushing components separately: {e}")
+
+        # Commits were deferred, so rows the earlier components handed over
+        # were rolled back with the rest; give them back before retrying
+        for name, component, data in taken:
+            if data is not None and hasattr(component, 'restore_pending'):
+                component.restore_pending(data)
+        for name, component in flushers:
+            try:
+                component.flush()
+            except Exception as e:
+                self.logger.error(f"Failed to flush {name} on shutdown: {e}")
+
+    async def shutdown(self):
+        """Drain queues, flush buffers in one transaction, then checkpoint"""
+        if self.shutting_down:
+            return
+        self.shutting_down = True
+        start = time.perf_counter()
+
+        drains = {
+            name: asyncio.create_task(component.drain(self.drain_timeout))
+            for name, component in self.components.items()
+            if hasattr(component, 'drain')
+        }
+        if drains:
+            done, pending = await asyncio.wait(drains.values(), timeout=self.drain_timeout)
+            for name, task in drains.items():
+                if task in pending:
+                    task.cancel()
+                    self.logger.warning(f"{name} did not drain within {self.drain_timeout}s")
+                elif task.exception():
+                    self.logger.error(f"Error draining {name}: {task.exception()}")
+
+        flushers = [(n, c) for n, c in self.components.items() if hasattr(c, 'flush')]
+        if flushers:
+            self._flush_all(flushers)
+
+        self.write_checkpoint()
+        self.logger.info(f"Shutdown drained and flushed in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,112 @@
+"""
+Member Cache Profiles for RevampBot
+Trims discord.py's member cache for low-memory deployments and keeps a
+bounded LRU of recently active members instead
+"""
+
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+MEMORY_PROFILES = ('full', 'balanced', 'low')
+
+
+def client_cache_options(profile: str) -> Dict[str, Any]:
+    """Keyword arguments for commands.Bot that implement a memory profile
+
+    full     - cache every member and chunk all guilds at startup (discord.py default)
+    balanced - cache members as they're seen, but don't chunk guilds at startup
+    low      - don't cache members at all; rely on the bounded LRU and lazy fetches
+    """
+    if profile not in MEMORY_PROFILES:
+        raise ValueError(f"Unknown memory profile '{profile}', expected one of: {', '.join(MEMORY_PROFILES)}")
+
+    if profile == 'full':
+        return {'member_cache_flags': discord.MemberCacheFlags.all(), 'chunk_guilds_at_startup': True}
+    if profile == 'balanced':
+        return {'member_cache_flags': discord.MemberCacheFlags.all(), 'chunk_guilds_at_startup': False}
+    return {'member_cache_flags': discord.MemberCacheFlags.none(), 'chunk_guilds_at_startup': False}
+
+
+class MemberLRU:
+    """Bounded cache of recently active members keyed by (guild_id, member_id)"""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.members: "OrderedDict[Tuple[int, int], discord.Member]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def put(self, member: discord.Member):
+        if self.max_size <= 0:
+            return
+        key = (member.guild.id, member.id)
+        self.members[key] = member
+        self.members.move_to_end(key)
+        while len(self.members) > self.max_size:
+            self.members.popitem(last=False)
+
+    def get(self, guild_id: int, member_id: int) -> Optional[discord.Member]:
+        member = self.members.get((guild_id, member_id))
+        if member is None:
+            self.misses += 1
+            return None
+        self.members.move_to_end((guild_id, member_id))
+        self.hits += 1
+        return member
+
+    def update(self, guild_id: int, data: Dict[str, Any]):
+        """Apply a GUILD_MEMBER_UPDATE payload to an entry discord.py isn't tracking
+
+        With the member cache trimmed, discord.py drops updates for members
+        it doesn't cache, so LRU entries would keep stale nicknames and roles.
+        """
+        member = self.members.get((guild_id, int(data['user']['id'])))
+        if member is None or member.guild.get_member(member.id) is member:
+            return
+        member._update(data)
+        member._update_inner_user(data['user'])
+
+    def discard(self, guild_id: int, member_id: int):
+        self.members.pop((guild_id, member_id), None)
+
+    def __len__(self):
+        return len(self.members)
+
+
+def find_member(bot, guild: discord.Guild, member_id: int) -> Optional[discord.Member]:
+    """Look a member up in discord.py's cache, then in the bot's LRU
+
+    Under the low profile guild.get_member only knows the bot itself, so
+    display paths use this before falling back to a raw user ID.
+    """
+    member = guild.get_member(member_id)
+    member_cache: Optional[MemberLRU] = getattr(bot, 'member_cache', None)
+    if member is None and member_cache is not None and member_cache.max_size:
+        member = member_cache.get(guild.id, member_id)
+    return member
+
+
+class CachedMember(commands.MemberConverter):
+    """Member converter that checks the bot's LRU before discord.py's lookup
+
+    MemberConverter already falls back to querying the gateway / HTTP API
+    when a member isn't cached, so with the low profile members are fetched
+    on demand and then kept in the LRU.
+    """
+
+    async def convert(self, ctx: commands.Context, argument: str) -> discord.Member:
+        member_cache: Optional[MemberLRU] = getattr(ctx.bot, 'member_cache', None)
+        match = self._get_id_match(argument) or re.match(r'<@!?([0-9]{15,20})>$', argument)
+        if member_cache is not None and match and ctx.guild:
+            member = member_cache.get(ctx.guild.id, int(match.group(1)))
+            if member is not None:
+                return member
+
+        member = await super().convert(ctx, argument)
+        if member_cache is not None:
+            member_cache.put(member)
+        return member
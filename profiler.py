@@ -0,0 +1,227 @@
+"""
+Profiler for RevampBot
+Per-handler timing for commands and events, an optional sampling stack
+profiler, and detection of synchronous calls that block the event loop
+"""
+
+import asyncio
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class HandlerStats:
+    """Call count, total and worst-case time for one handler"""
+    __slots__ = ('calls', 'total', 'max')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float):
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+
+class Profiler:
+    """On-demand profiler for the bot's event loop
+
+    Handler timing is always collected while active. In 'sample' mode a
+    background thread also samples the loop thread's stack (written in
+    collapsed-stack format for flamegraph tools); in 'cprofile' mode the
+    loop thread runs under cProfile (written as pstats).
+    """
+
+    def __init__(self, output_dir: str = "profiles", sample_interval: float = 0.005,
+                 block_threshold: float = 0.1):
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.block_threshold = block_threshold
+        self.active = False
+        self.mode = 'sample'
+        self.started_at = 0.0
+        self.handlers: Dict[str, HandlerStats] = defaultdict(HandlerStats)
+        self.stacks: Counter = Counter()
+        self.slow_calls: Dict[str, HandlerStats] = defaultdict(HandlerStats)
+        self.loop_thread_id: Optional[int] = None
+        self.heartbeat = 0.0
+        self.sampler: Optional[threading.Thread] = None
+        self.heartbeat_task: Optional[asyncio.Task] = None
+        self.stop_handle: Optional[asyncio.Task] = None
+        self.stop_event = threading.Event()
+        self.cprofile: Optional[cProfile.Profile] = None
+        self.own_files = self._own_files()
+        self.logger = logging.getLogger('RevampBot.Profiler')
+
+    @staticmethod
+    def _own_files() -> set:
+        here = os.path.dirname(os.path.abspath(__file__))
+        files = set()
+        for directory in (here, os.path.join(here, 'cogs')):
+            if os.path.isdir(directory):
+                files.update(p for p in os.listdir(directory) if p.endswith('.py'))
+        files.discard('profiler.py')
+        return files
+
+    def start(self, mode: str = 'sample'):
+        """Start profiling; must be called from the event loop thread"""
+        if self.active:
+            return
+        if mode not in ('sample', 'cprofile'):
+            raise ValueError("Profile mode must be 'sample' or 'cprofile'")
+
+        self.mode = mode
+        self.handlers.clear()
+        self.stacks.clear()
+        self.slow_calls.clear()
+        self.loop_thread_id = threading.get_ident()
+        self.started_at = time.perf_counter()
+        self.heartbeat = time.perf_counter()
+        self.stop_event.clear()
+        self.active = True
+
+        self.heartbeat_task = asyncio.get_running_loop().create_task(self._beat())
+        self.sampler = threading.Thread(target=self._sample, name='revampbot-profiler', daemon=True)
+        self.sampler.start()
+        if mode == 'cprofile':
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        self.logger.info(f"Profiler started ({mode} mode)")
+
+    def stop(self) -> List[str]:
+        """Stop profiling and write the results; returns the written file paths"""
+        if not self.active:
+            return []
+        self.active = False
+        # A timed window belongs to this session only; don't let it stop the next one
+        if self.stop_handle is not None and self.stop_handle is not asyncio.current_task():
+            self.stop_handle.cancel()
+        self.stop_handle = None
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        self.stop_event.set()
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+        if self.sampler is not None:
+            self.sampler.join(timeout=1.0)
+
+        paths = self._dump()
+        self.cprofile = None
+        self.logger.info(f"Profiler stopped, wrote {', '.join(paths)}")
+        return paths
+
+    def stop_after(self, seconds: float, on_stop: Callable[[], Awaitable[Any]]):
+        """Await on_stop (which should call stop()) once the window is over
+
+        The window runs as a task owned by the profiler, so stopping early
+        cancels it and it can never end a later session.
+        """
+        async def window():
+            await asyncio.sleep(seconds)
+            if self.active:
+                await on_stop()
+
+        if self.stop_handle is not None:
+            self.stop_handle.cancel()
+        self.stop_handle = asyncio.get_running_loop().create_task(window())
+
+    def record(self, name: str, elapsed: float):
+        self.handlers[name].add(elapsed)
+
+    async def timed(self, name: str, coro):
+        """Await a handler coroutine and record its wall time"""
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    async def _beat(self):
+        # The sampler thread treats a stale heartbeat as a blocked loop
+        while True:
+            self.heartbeat = time.perf_counter()
+            await asyncio.sleep(self.block_threshold / 4)
+
+    def _sample(self):
+        blocked_since = None
+        blocked_stack = None
+        while not self.stop_event.wait(self.sample_interval):
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            stack = self._collapse(frame)
+            if self.mode == 'sample':
+                self.stacks[stack] += 1
+
+            stale = time.perf_counter() - self.heartbeat
+            if stale > self.block_threshold:
+                if blocked_since is None:
+                    blocked_since = self.heartbeat
+                    blocked_stack = stack
+            elif blocked_since is not None:
+                self.slow_calls[self._culprit(blocked_stack)].add(time.perf_counter() - blocked_since)
+                blocked_since = None
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def _culprit(self, stack: str) -> str:
+        """Innermost frame from our own code, plus the frame that was actually running"""
+        frames = stack.split(';')
+        for entry in reversed(frames):
+            filename = entry.rsplit('(', 1)[-1].split(':', 1)[0]
+            if filename in self.own_files:
+                return f"{entry} → {frames[-1]}"
+        return frames[-1]
+
+    def report(self, limit: int = 20) -> Tuple[List[Tuple[str, HandlerStats]], List[Tuple[str, HandlerStats]]]:
+        """Handlers by total time, and slow synchronous calls by worst case"""
+        handlers = sorted(self.handlers.items(), key=lambda item: item[1].total, reverse=True)
+        slow = sorted(self.slow_calls.items(), key=lambda item: item[1].max, reverse=True)
+        return handlers[:limit], slow[:limit]
+
+    def _dump(self) -> List[str]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        base = os.path.join(self.output_dir, f"profile-{stamp}")
+        paths = []
+
+        if self.mode == 'cprofile' and self.cprofile is not None:
+            self.cprofile.dump_stats(f"{base}.pstats")
+            paths.append(f"{base}.pstats")
+        elif self.stacks:
+            with open(f"{base}.collapsed", 'w', encoding='utf-8') as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            paths.append(f"{base}.collapsed")
+
+        handlers, slow = self.report(limit=len(self.handlers) + len(self.slow_calls))
+        duration = time.perf_counter() - self.started_at
+        with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+            f.write(f"RevampBot profile - {duration:.1f}s window, {self.mode} mode\n\n")
+            f.write(f"{'Handler':<45} {'Calls':>8} {'Total ms':>10} {'Avg ms':>8} {'Max ms':>8}\n")
+            f.write("-" * 83 + "\n")
+            for name, stats in handlers:
+                f.write(f"{name:<45} {stats.calls:>8} {stats.total * 1000:>10.1f} "
+                        f"{stats.total * 1000 / stats.calls:>8.2f} {stats.max * 1000:>8.1f}\n")
+            f.write(f"\nSynchronous calls blocking the loop for more than {self.block_threshold * 1000:.0f}ms:\n")
+            if not slow:
+                f.write("  none detected\n")
+            for culprit, stats in slow:
+                f.write(f"  {stats.calls:>4}x, worst {stats.max * 1000:.0f}ms: {culprit}\n")
+        paths.append(f"{base}.txt")
+        return paths
@@ -0,0 +1,218 @@
+"""
+Command Scheduler for RevampBot
+Priority classes, weighted fair queuing across guilds, per-command
+concurrency caps and load shedding for command invocations
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+PRIORITIES = {'high': 0, 'normal': 1, 'low': 2}
+PRIORITY_NAMES = {value: name for name, value in PRIORITIES.items()}
+BUSY_MESSAGE = "⏳ The bot is busy right now, please try again in a moment."
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted seconds, in milliseconds"""
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+
+@dataclass(order=True)
+class Job:
+    tag: float
+    seq: int
+    priority: int = field(compare=False)
+    guild_id: int = field(compare=False)
+    command: str = field(compare=False)
+    ctx: Any = field(compare=False)
+    invoke: Callable[[Any], Awaitable[None]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class CommandScheduler:
+    """Runs command invocations through prioritized, per-guild fair queues
+
+    Commands declare their class and cap through discord.py's command extras:
+        @commands.command(extras={'priority': 'high', 'concurrency': 2})
+    Within a priority class, guilds are served by start-time fair queuing:
+    each job gets a virtual finish tag of max(class clock, guild's last tag)
+    + 1 / weight, so a guild flooding commands only delays itself.
+    """
+
+    def __init__(self, max_concurrency: int = 16, max_queue: int = 500,
+                 max_guild_queue: int = 20, guild_weights: Optional[Dict[int, float]] = None,
+                 busy_reply_interval: float = 10.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_guild_queue = max_guild_queue
+        self.guild_weights = guild_weights or {}
+        self.busy_reply_interval = busy_reply_interval
+        self.queues: List[List[Job]] = [[] for _ in PRIORITIES]
+        self.virtual_time = [0.0 for _ in PRIORITIES]
+        self.last_tag: Dict[Tuple[int, int], float] = {}
+        self.guild_pending: Dict[int, int] = defaultdict(int)
+        self.command_running: Dict[str, int] = defaultdict(int)
+        self.command_limits: Dict[str, int] = {}
+        self.running = 0
+        self.seq = 0
+        self.wait_times: List[Deque[float]] = [deque(maxlen=2000) for _ in PRIORITIES]
+        self.busy_replies: Dict[int, float] = {}
+        self.stats = {'submitted': 0, 'completed': 0, 'shed': 0}
+        self.wakeup: Optional[asyncio.Event] = None
+        self.idle: Optional[asyncio.Event] = None
+        self.dispatcher: Optional[asyncio.Task] = None
+        self.tasks: Set[asyncio.Task] = set()
+        self.logger = logging.getLogger('RevampBot.Scheduler')
+
+    def start(self):
+        self.wakeup = asyncio.Event()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self):
+        if self.dispatcher:
+            self.dispatcher.cancel()
+            await asyncio.gather(self.dispatcher, return_exceptions=True)
+            self.dispatcher = None
+
+    async def drain(self, timeout: float):
+        """Wait for queued and running commands to finish (lifecycle hook)"""
+        if self.idle is not None:
+            await self.idle.wait()
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self.queues)
+
+    async def submit(self, ctx, invoke: Callable[[Any], Awaitable[None]]):
+        """Queue a command invocation and wait for it to finish"""
+        if self.wakeup is None:
+            # Not started (e.g. during tests or shutdown): run inline
+            await invoke(ctx)
+            return
+
+        command = ctx.command
+        extras = getattr(command, 'extras', {}) or {}
+        priority = PRIORITIES.get(extras.get('priority', 'normal'), PRIORITIES['normal'])
+        name = command.qualified_name
+        if 'concurrency' in extras:
+            self.command_limits[name] = int(extras['concurrency'])
+        guild_id = ctx.guild.id if ctx.guild else 0
+
+        # Shed load: a guild over its share always, others only below high priority
+        over_guild = self.guild_pending[guild_id] >= self.max_guild_queue
+        over_total = self.queued >= self.max_queue and priority != PRIORITIES['high']
+        if over_guild or over_total:
+            self.stats['shed'] += 1
+            await self._reply_busy(ctx)
+            return
+
+        weight = self.guild_weights.get(guild_id, 1.0)
+        key = (priority, guild_id)
+        tag = max(self.virtual_time[priority], self.last_tag.get(key, 0.0)) + 1.0 / weight
+        self.last_tag[key] = tag
+
+        self.seq += 1
+        loop = asyncio.get_running_loop()
+        job = Job(tag, self.seq, priority, guild_id, name, ctx, invoke,
+                  loop.create_future(), time.perf_counter())
+        heapq.heappush(self.queues[priority], job)
+        self.guild_pending[guild_id] += 1
+        self.stats['submitted'] += 1
+        self.idle.clear()
+        self.wakeup.set()
+
+        await job.future
+
+    async def _reply_busy(self, ctx):
+        channel_id = getattr(ctx.channel, 'id', 0)
+        now = time.monotonic()
+        # Don't spend our own rate limit on repeated busy replies
+        if now - self.busy_replies.get(channel_id, float('-inf')) < self.busy_reply_interval:
+            return
+        self.busy_replies[channel_id] = now
+        try:
+            await ctx.send(BUSY_MESSAGE)
+        except Exception as e:
+            self.logger.warning(f"Failed to send busy reply: {e}")
+
+    def _next_job(self) -> Optional[Job]:
+        """Highest-priority job with the smallest tag whose command has a free slot"""
+        for priority, queue in enumerate(self.queues):
+            deferred = []
+            job = None
+            while queue:
+                candidate = heapq.heappop(queue)
+                limit = self.command_limits.get(candidate.command)
+                if limit is not None and self.command_running[candidate.command] >= limit:
+                    deferred.append(candidate)
+                    continue
+                job = candidate
+                break
+            for candidate in deferred:
+                heapq.heappush(queue, candidate)
+            if job is not None:
+                self.virtual_time[priority] = job.tag
+                return job
+        return None
+
+    async def _dispatch_loop(self):
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            while self.running < self.max_concurrency:
+                job = self._next_job()
+                if job is None:
+                    break
+                self.guild_pending[job.guild_id] -= 1
+                if not self.guild_pending[job.guild_id]:
+                    del self.guild_pending[job.guild_id]
+                self.running += 1
+                self.command_running[job.command] += 1
+                self.wait_times[job.priority].append(time.perf_counter() - job.enqueued_at)
+                task = asyncio.create_task(self._run(job))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, job: Job):
+        try:
+            await job.invoke(job.ctx)
+        except Exception as e:
+            self.logger.error(f"Command {job.command} failed in scheduler: {e}")
+        finally:
+            # The submitter may have gone away (e.g. its task was cancelled)
+            if not job.future.done():
+                job.future.set_result(None)
+            self.running -= 1
+            self.command_running[job.command] -= 1
+            self.stats['completed'] += 1
+            if not self.running and not self.queued:
+                self.idle.set()
+            self.wakeup.set()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depths, counters and queue-wait percentiles (ms) per priority"""
+        latency = {}
+        for priority, samples in enumerate(self.wait_times):
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+            latency[PRIORITY_NAMES[priority]] = {
+                'p50': _percentile(ordered, 0.50),
+                'p95': _percentile(ordered, 0.95),
+                'p99': _percentile(ordered, 0.99),
+                'samples': len(ordered)
+            }
+        return {
+            **self.stats,
+            'running': self.running,
+            'queued': {PRIORITY_NAMES[p]: len(q) for p, q in enumerate(self.queues)},
+            'wait_ms': latency
+        }
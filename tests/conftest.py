@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# The bot's modules live at the repository root rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+
+
+@pytest.fixture
+def database(tmp_path):
+    """A DatabaseManager on a fresh schema in a scratch file"""
+    database = DatabaseManager(os.path.join(tmp_path, 'revampbot.db'))
+    database.connect()
+    database.initialize_schema()
+    yield database
+    database.close()
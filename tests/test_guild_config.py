@@ -0,0 +1,33 @@
+# test_guild_config.py - Sparse per-guild overrides on top of shared defaults
+import pytest
+
+from guild_config import config_diff, default_config, merge_config
+
+
+def test_diff_round_trips_through_merge():
+    config = default_config()
+    config['log_channel'] = 5
+    config['moderation']['auto_mod'] = True
+
+    diff = config_diff(default_config(), config)
+
+    assert diff == {'log_channel': 5, 'moderation': {'auto_mod': True}}
+    assert merge_config(default_config(), diff) == config
+
+
+@pytest.mark.parametrize('stored', [None, 'not json', '[1, 2]'])
+def test_invalid_stored_config_reads_as_missing(database, stored):
+    database.connection.execute('DROP TABLE guild_config')
+    # The old inline schema allowed NULL config_data
+    database.connection.execute('CREATE TABLE guild_config (guild_id INTEGER PRIMARY KEY, config_data TEXT)')
+    database.connection.execute('INSERT INTO guild_config VALUES (1, ?)', (stored,))
+
+    assert database.get_guild_config(1) is None
+
+
+def test_reconcile_only_adds_missing_guilds(database):
+    database.set_guild_configs({1: {'log_channel': 5}})
+
+    assert database.reconcile_guild_configs([1, 2, 3, 3]) == 2
+    assert database.get_guild_config(1) == {'log_channel': 5}
+    assert database.get_guild_config(2) == {}
@@ -0,0 +1,85 @@
+# test_http_client.py - Rate-limit handling and JSON decoding against a local stub
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from http_client import HttpClient, RateLimited, github_repo_api_url
+
+
+async def exhausted(request):
+    # GitHub-style headers: no requests left until an hour from now
+    return web.json_response({'name': request.match_info['name']}, headers={
+        'X-RateLimit-Remaining': '0',
+        'X-RateLimit-Reset': str(int(time.time()) + 3600)
+    })
+
+
+async def not_json(request):
+    return web.Response(text='<html>maintenance</html>', content_type='text/html')
+
+
+async def with_client(scenario):
+    app = web.Application()
+    app.router.add_get('/repos/{name}', exhausted)
+    app.router.add_get('/html', not_json)
+    server = TestServer(app)
+    await server.start_server()
+    client = HttpClient(cache_ttl=0)
+    try:
+        return await scenario(client, server)
+    finally:
+        await client.close()
+        await server.close()
+
+
+def test_distant_rate_limit_reset_fails_fast():
+    async def scenario(client, server):
+        assert await client.get_json(str(server.make_url('/repos/a'))) == {'name': 'a'}
+        start = time.monotonic()
+        with pytest.raises(RateLimited) as error:
+            await client.get_json(str(server.make_url('/repos/b')))
+        return time.monotonic() - start, error.value
+
+    elapsed, error = asyncio.run(with_client(scenario))
+    assert elapsed < 0.5
+    assert error.retry_after > 3000
+
+
+def test_rate_limited_request_falls_back_to_stale_cache():
+    async def scenario(client, server):
+        url = str(server.make_url('/repos/a'))
+        await client.get_json(url)
+        # cache_ttl=0, so this is a stale entry rather than a fresh hit
+        response = await client.get(url)
+        return response, client.stats
+
+    response, stats = asyncio.run(with_client(scenario))
+    assert response.from_cache
+    assert response.json() == {'name': 'a'}
+    assert stats['requests'] == 1
+
+
+def test_non_json_body_returns_none():
+    async def scenario(client, server):
+        return await client.get_json(str(server.make_url('/html')))
+
+    assert asyncio.run(with_client(scenario)) is None
+
+
+@pytest.mark.parametrize('url,expected', [
+    ('https://github.com/Rapptz/discord.py', 'https://api.github.com/repos/Rapptz/discord.py'),
+    ('https://www.github.com/owner/repo.git/tree/main', 'https://api.github.com/repos/owner/repo'),
+    ('https://github.com/owner', None),
+    ('https://gitlab.com/owner/repo', None),
+    ('https://github.com/../users', None),
+    ('https://github.com/owner/..', None),
+    ('https://github.com/owner/.', None),
+    ('https://github.com/owner/.git', None),
+    ('https://github.com/owner/repo%2F..', None),
+    ('https://github.com/own%20er/repo', None),
+])
+def test_github_repo_api_url_validates_owner_and_repo(url, expected):
+    assert github_repo_api_url(url) == expected
@@ -0,0 +1,76 @@
+# test_leveling.py - Stored levels recalculated in SQL agree with LevelCurve
+import asyncio
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from cogs.leveling import CURVES, LevelCurve, Leveling
+from member_cache import MemberLRU, client_cache_options
+
+
+def levels(database, guild_id):
+    rows = database.connection.execute(
+        'SELECT xp, level FROM user_xp WHERE guild_id = ? ORDER BY user_id', (guild_id,)
+    )
+    return [(row['xp'], row['level']) for row in rows]
+
+
+@pytest.mark.parametrize('name,base,factor', [(name, 100, 1.2) for name in CURVES] + [
+    ('linear', 0.01, 1.2),        # tiny base: thresholds are forced to stay increasing
+    ('exponential', 10 ** 12, 10.0),  # table stops early at MAX_XP
+])
+def test_recalculate_levels_matches_level_for_xp(database, name, base, factor):
+    curve = LevelCurve(name, base, factor)
+    # Every threshold, its neighbours and values past the top of the table
+    xps = sorted({max(0, t + d) for t in curve.thresholds for d in (-1, 0, 1)} | {2 ** 62, 2 ** 63 - 1})
+    database.connection.executemany(
+        'INSERT INTO user_xp (user_id, guild_id, xp, level) VALUES (?, ?, ?, 1)',
+        [(user_id, guild_id, xp) for guild_id in (1, 2) for user_id, xp in enumerate(xps)]
+    )
+
+    assert database.recalculate_levels(1, curve.thresholds) == len(xps)
+    assert levels(database, 1) == [(xp, curve.level_for_xp(xp)) for xp in xps]
+    # Other guilds keep their stored levels
+    assert levels(database, 2) == [(xp, 1) for xp in xps]
+
+
+def test_leaderboard_uses_xp_index(database):
+    plan = database.connection.execute(
+        'EXPLAIN QUERY PLAN SELECT user_id, xp, level, total_messages FROM user_xp '
+        'WHERE guild_id = ? ORDER BY xp DESC LIMIT ?', (1, 10)
+    ).fetchall()
+    details = ' '.join(row['detail'] for row in plan)
+    assert 'idx_user_xp_guild_xp' in details
+    assert 'TEMP B-TREE' not in details
+
+
+def test_leaderboard_names_members_from_the_lru_under_the_low_profile(database):
+    client = discord.Client(intents=discord.Intents.all(), **client_cache_options('low'))
+    state = client._connection
+    guild = discord.Guild(data={
+        'id': '1', 'name': 'g', 'roles': [], 'emojis': [], 'stickers': [], 'features': [], 'channels': []
+    }, state=state)
+    lru = MemberLRU(10)
+    lru.put(discord.Member(data={
+        'user': {'id': '42', 'username': 'active', 'discriminator': '0', 'avatar': None, 'global_name': None},
+        'nick': 'Regular', 'roles': [], 'joined_at': None, 'deaf': False, 'mute': False, 'flags': 0
+    }, guild=guild, state=state))
+    database.connection.executemany(
+        'INSERT INTO user_xp (user_id, guild_id, xp, level) VALUES (?, 1, ?, 1)', [(42, 500), (7, 100)]
+    )
+
+    sent = []
+
+    async def send(embed):
+        sent.append(embed)
+
+    cog = Leveling(SimpleNamespace(database=database, member_cache=lru))
+    ctx = SimpleNamespace(guild=guild, send=send)
+    asyncio.run(cog.leaderboard.callback(cog, ctx))
+
+    assert guild.get_member(42) is None
+    assert sent[0].description.splitlines() == [
+        '**1.** Regular - level 1 (500 XP)',
+        '**2.** User 7 - level 1 (100 XP)',
+    ]
@@ -0,0 +1,57 @@
+# test_lifecycle.py - Shutdown flush against a real SQLite database
+import asyncio
+from types import SimpleNamespace
+
+from cogs.analytics import Analytics
+from cogs.moderation import Moderation
+from lifecycle import LifecycleManager
+
+
+def make_bot(database):
+    return SimpleNamespace(
+        database=database,
+        config=SimpleNamespace(analytics_flush_interval=60),
+        get_guild_config=lambda guild_id: {}
+    )
+
+
+def audit_rows(database):
+    return database.connection.execute('SELECT COUNT(*) FROM moderation_logs').fetchone()[0]
+
+
+def test_failed_flush_does_not_lose_rows_from_earlier_components(database):
+    bot = make_bot(database)
+    moderation, analytics = Moderation(bot), Analytics(bot)
+    lifecycle = LifecycleManager(bot.database)
+    lifecycle.register('moderation', moderation)
+    lifecycle.register('analytics', analytics)
+
+    ctx = SimpleNamespace(guild=SimpleNamespace(id=1), author=SimpleNamespace(id=2))
+    for target in range(3):
+        moderation.audit(ctx, target, 'kick')
+    # A malformed key makes flush_activity fail after moderation has already written
+    analytics.aggregator.counts[(1, 0, 1)] += 1
+
+    asyncio.run(lifecycle.shutdown())
+
+    assert audit_rows(bot.database) == 3
+    assert not moderation.pending_audit
+    assert analytics.aggregator.counts == {(1, 0, 1): 1}
+
+
+def test_successful_flush_commits_everything_once(database):
+    bot = make_bot(database)
+    moderation, analytics = Moderation(bot), Analytics(bot)
+    lifecycle = LifecycleManager(bot.database)
+    lifecycle.register('moderation', moderation)
+    lifecycle.register('analytics', analytics)
+
+    ctx = SimpleNamespace(guild=SimpleNamespace(id=1), author=SimpleNamespace(id=2))
+    moderation.audit(ctx, 5, 'ban')
+    analytics.aggregator.record(1, 10, 20, 0)
+
+    asyncio.run(lifecycle.shutdown())
+
+    assert audit_rows(bot.database) == 1
+    assert bot.database.get_activity_summary(1, 0)['messages'] == 1
+    assert not analytics.aggregator
@@ -0,0 +1,46 @@
+# test_member_cache.py - LRU entries under the trimmed (low) member cache
+import discord
+
+from member_cache import MemberLRU, client_cache_options
+
+
+def make_member(state, guild, member_id, nick=None, roles=()):
+    return discord.Member(data={
+        'user': {'id': str(member_id), 'username': f'user{member_id}', 'discriminator': '0',
+                 'avatar': None, 'global_name': None},
+        'nick': nick, 'roles': [str(r) for r in roles], 'joined_at': None,
+        'deaf': False, 'mute': False, 'flags': 0
+    }, guild=guild, state=state)
+
+
+def test_member_update_refreshes_lru_entry_that_discord_py_drops():
+    client = discord.Client(intents=discord.Intents.all(), **client_cache_options('low'))
+    state = client._connection
+    guild = discord.Guild(data={
+        'id': '1', 'name': 'g', 'roles': [], 'emojis': [], 'stickers': [], 'features': [], 'channels': []
+    }, state=state)
+    state._add_guild(guild)
+
+    lru = MemberLRU(10)
+    lru.put(make_member(state, guild, 42, nick='old'))
+    payload = {
+        'guild_id': '1', 'nick': 'new', 'roles': ['7'],
+        'user': {'id': '42', 'username': 'renamed', 'discriminator': '0', 'avatar': None, 'global_name': None}
+    }
+
+    # With no member cache, discord.py discards the update...
+    state.parsers['GUILD_MEMBER_UPDATE'](payload)
+    member = lru.get(1, 42)
+    assert member.nick == 'old'
+
+    # ...so the bot applies it to the LRU entry itself
+    lru.update(1, payload)
+    assert member.nick == 'new'
+    assert member.name == 'renamed'
+    assert list(member._roles) == [7]
+
+
+def test_update_ignores_members_not_in_lru():
+    lru = MemberLRU(10)
+    lru.update(1, {'guild_id': '1', 'roles': [], 'user': {'id': '5'}})
+    assert len(lru) == 0
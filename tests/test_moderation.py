@@ -0,0 +1,62 @@
+# test_moderation.py - Audit log mirroring and !modlog against a real SQLite database
+import asyncio
+from types import SimpleNamespace
+
+from cogs.moderation import Moderation
+
+
+class RecordingChannel:
+    def __init__(self):
+        self.embeds = []
+
+    async def send(self, content=None, embed=None):
+        self.embeds.append(embed)
+
+
+def make_cog(database, channel):
+    guild = SimpleNamespace(id=1, get_channel=lambda channel_id: channel)
+    bot = SimpleNamespace(
+        database=database,
+        get_guild=lambda guild_id: guild,
+        get_guild_config=lambda guild_id: {'log_channel': 99}
+    )
+    return Moderation(bot), guild
+
+
+def test_long_reasons_stay_within_embed_limits(database):
+    channel = RecordingChannel()
+    cog, guild = make_cog(database, channel)
+    moderator = SimpleNamespace(guild=guild, author=SimpleNamespace(id=2))
+    for target in range(45):
+        cog.audit(moderator, 100 + target, 'ban', 'x' * 2000)
+
+    asyncio.run(cog._send_mirrors())
+
+    assert sum(len(embed.description.splitlines()) for embed in channel.embeds) == 45
+    assert all(len(embed.description) <= 4096 for embed in channel.embeds)
+    assert all(len(line) < 250 for embed in channel.embeds for line in embed.description.splitlines())
+
+
+def test_modlog_pages_by_target_and_moderator(database):
+    channel = RecordingChannel()
+    cog, guild = make_cog(database, channel)
+    for moderator_id in (2, 3):
+        ctx = SimpleNamespace(guild=guild, author=SimpleNamespace(id=moderator_id))
+        for target in range(15):
+            cog.audit(ctx, 100 + target % 3, 'kick', f'reason {target}')
+
+    ctx = SimpleNamespace(guild=guild, prefix='!', send=channel.send)
+    asyncio.run(cog._send_history(ctx, 'by 3', '!modlog by 3 ', None, moderator_id=3))
+    first = channel.embeds[-1]
+    assert len(first.description.splitlines()) == 10
+    assert all('by <@3>' in line for line in first.description.splitlines())
+
+    cursor = int(first.footer.text.rsplit(' ', 1)[1])
+    asyncio.run(cog._send_history(ctx, 'by 3', '!modlog by 3 ', cursor, moderator_id=3))
+    second = channel.embeds[-1]
+    assert len(second.description.splitlines()) == 5
+    assert second.footer.text is None
+
+    rows = cog.bot.database.get_moderation_history(1, target_user_id=101, limit=50)
+    assert len(rows) == 10
+    assert [row['id'] for row in rows] == sorted((row['id'] for row in rows), reverse=True)
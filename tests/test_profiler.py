@@ -0,0 +1,48 @@
+# test_profiler.py - Timed profiling windows
+import asyncio
+
+from profiler import Profiler
+
+
+def test_window_stops_the_session_it_was_started_for(tmp_path):
+    async def scenario():
+        profiler = Profiler(output_dir=str(tmp_path))
+        reports = []
+
+        async def on_stop():
+            reports.append(profiler.stop())
+
+        profiler.start()
+        profiler.stop_after(0.05, on_stop)
+        await asyncio.sleep(0.1)
+        return profiler, reports
+
+    profiler, reports = asyncio.run(scenario())
+    assert not profiler.active
+    assert len(reports) == 1 and reports[0]
+    assert profiler.stop_handle is None
+
+
+def test_stopping_early_cancels_the_window(tmp_path):
+    async def scenario():
+        profiler = Profiler(output_dir=str(tmp_path))
+        stopped = []
+
+        async def on_stop():
+            stopped.append(profiler.stop())
+
+        profiler.start()
+        profiler.stop_after(0.05, on_stop)
+        window = profiler.stop_handle
+        profiler.stop()
+        # A new session must outlive the first session's window
+        profiler.start()
+        await asyncio.sleep(0.1)
+        active = profiler.active
+        profiler.stop()
+        return window, active, stopped
+
+    window, active, stopped = asyncio.run(scenario())
+    assert window.cancelled()
+    assert active
+    assert stopped == []
@@ -0,0 +1,141 @@
+# test_scheduler.py - Load shedding, concurrency caps and per-guild fairness
+import asyncio
+from types import SimpleNamespace
+
+from scheduler import BUSY_MESSAGE, CommandScheduler
+
+
+class Ctx:
+    def __init__(self, guild_id, command='cmd', priority='normal', concurrency=None):
+        extras = {'priority': priority}
+        if concurrency is not None:
+            extras['concurrency'] = concurrency
+        self.command = SimpleNamespace(qualified_name=command, extras=extras)
+        self.guild = SimpleNamespace(id=guild_id)
+        self.channel = SimpleNamespace(id=guild_id)
+        self.replies = []
+
+    async def send(self, content):
+        self.replies.append(content)
+
+
+async def settle():
+    # Let submitters enqueue and the dispatcher start what it can
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_sheds_per_guild_and_globally_but_not_high_priority():
+    async def scenario():
+        scheduler = CommandScheduler(max_concurrency=1, max_queue=3, max_guild_queue=2)
+        scheduler.start()
+        release = asyncio.Event()
+        started = []
+
+        async def invoke(ctx):
+            started.append(ctx)
+            await release.wait()
+
+        contexts = [Ctx(1) for _ in range(4)] + [Ctx(2), Ctx(3), Ctx(3, priority='high')]
+        submissions = []
+        # The first command takes the only slot; everything after it has to queue
+        for ctx in contexts[:1], contexts[1:]:
+            submissions += [asyncio.create_task(scheduler.submit(c, invoke)) for c in ctx]
+            await settle()
+        queued = scheduler.queued
+
+        release.set()
+        await asyncio.gather(*submissions)
+        await scheduler.stop()
+        return contexts, started, queued, scheduler.stats
+
+    contexts, started, queued, stats = asyncio.run(scenario())
+    guild1 = contexts[:4]
+    # Guild 1's first command runs and two wait; the fourth is over the guild's share
+    assert [ctx.replies for ctx in guild1] == [[], [], [], [BUSY_MESSAGE]]
+    # Guild 2 fills the global queue, so guild 3's normal command is shed and its high one is not
+    normal3, high3 = contexts[5], contexts[6]
+    assert contexts[4].replies == []
+    assert normal3.replies == [BUSY_MESSAGE]
+    assert high3.replies == []
+    assert queued == 4
+    assert stats == {'submitted': 5, 'completed': 5, 'shed': 2}
+    # High priority runs as soon as the slot frees up
+    assert started[1] is high3
+
+
+def test_next_job_respects_command_concurrency_cap():
+    async def scenario():
+        scheduler = CommandScheduler(max_concurrency=4)
+        scheduler.start()
+        running = {'purge': 0, 'ping': 0}
+        peak = {'purge': 0, 'ping': 0}
+
+        async def invoke(ctx):
+            name = ctx.command.qualified_name
+            running[name] += 1
+            peak[name] = max(peak[name], running[name])
+            await asyncio.sleep(0.01)
+            running[name] -= 1
+
+        contexts = [Ctx(i, 'purge', concurrency=1) for i in range(4)] + [Ctx(9, 'ping') for _ in range(3)]
+        submissions = [asyncio.create_task(scheduler.submit(ctx, invoke)) for ctx in contexts]
+        await settle()
+        # The three capped purges wait behind the running one while the pings go ahead
+        waiting = [job.command for job in scheduler.queues[1]]
+        await asyncio.gather(*submissions)
+        await scheduler.stop()
+        return peak, waiting
+
+    peak, waiting = asyncio.run(scenario())
+    assert peak == {'purge': 1, 'ping': 3}
+    assert waiting == ['purge'] * 3
+
+
+def test_flooding_guild_does_not_delay_other_guilds():
+    async def scenario():
+        scheduler = CommandScheduler(max_concurrency=1, max_guild_queue=50)
+        scheduler.start()
+        order = []
+
+        async def invoke(ctx):
+            order.append(ctx.guild.id)
+            await asyncio.sleep(0.005)
+
+        flood = [asyncio.create_task(scheduler.submit(Ctx(1), invoke)) for _ in range(30)]
+        await asyncio.sleep(0.02)
+        arrived = len(order)
+        others = [asyncio.create_task(scheduler.submit(Ctx(guild_id), invoke)) for guild_id in (2, 3)]
+        await asyncio.gather(*flood, *others)
+        await scheduler.stop()
+        return order, arrived
+
+    order, arrived = asyncio.run(scenario())
+    assert 0 < arrived < 25
+    # The latecomers wait for at most one more of the flooding guild's commands, not its whole backlog
+    assert sorted(order[arrived:arrived + 3]) == [1, 2, 3]
+    assert order.count(1) == 30
+
+
+def test_drain_returns_once_idle():
+    async def scenario():
+        scheduler = CommandScheduler(max_concurrency=2)
+        scheduler.start()
+        # Nothing queued yet: returns straight away
+        await asyncio.wait_for(scheduler.drain(timeout=1), 0.1)
+
+        done = []
+
+        async def invoke(ctx):
+            await asyncio.sleep(0.01)
+            done.append(ctx)
+
+        submissions = [asyncio.create_task(scheduler.submit(Ctx(i % 3), invoke)) for i in range(6)]
+        await settle()
+        await asyncio.wait_for(scheduler.drain(timeout=1), 1)
+        state = (len(done), scheduler.running, scheduler.queued)
+        await asyncio.gather(*submissions)
+        await scheduler.stop()
+        return state
+
+    assert asyncio.run(scenario()) == (6, 0, 0)
@@ -0,0 +1,226 @@
+# test_welcome.py - Join pipeline against a local Discord API stub
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import discord
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from cogs.welcome import RoleAssignmentQueue, RoleJob, Welcome
+
+
+class DiscordStub:
+    """Minimal stand-in for the member PATCH and message POST endpoints, reached through discord.py's HTTPClient"""
+
+    def __init__(self, rate_limited=None):
+        # member_id -> number of 429s to answer before accepting the PATCH
+        self.rate_limited = dict(rate_limited or {})
+        self.patches = []
+        self.messages = []
+        self.server = None
+        self.http = None
+        self.base = None
+
+    @staticmethod
+    def respond(data, status=200, headers=None):
+        # discord.py only parses bodies whose content type is exactly application/json (no charset)
+        return web.Response(body=json.dumps(data).encode(), status=status,
+                            headers={'Content-Type': 'application/json', **(headers or {})})
+
+    async def get_me(self, request):
+        return self.respond({'id': '1', 'username': 'stub', 'discriminator': '0', 'avatar': None})
+
+    async def patch_member(self, request):
+        member_id = int(request.match_info['member_id'])
+        self.patches.append((time.monotonic(), int(request.match_info['guild_id']), member_id))
+        if self.rate_limited.get(member_id):
+            self.rate_limited[member_id] -= 1
+            # discord.py only treats a 429 as a rate limit (and retries it) when it came through Discord's proxy
+            return self.respond(
+                {'message': 'You are being rate limited.', 'retry_after': 0.05, 'global': False},
+                status=429, headers={'Via': '1.1 google'}
+            )
+        return self.respond({})
+
+    async def post_message(self, request):
+        self.messages.append((int(request.match_info['channel_id']), await request.json()))
+        return self.respond({})
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get('/users/@me', self.get_me)
+        app.router.add_patch('/guilds/{guild_id}/members/{member_id}', self.patch_member)
+        app.router.add_post('/channels/{channel_id}/messages', self.post_message)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.base, discord.http.Route.BASE = discord.http.Route.BASE, str(self.server.make_url('')).rstrip('/')
+        self.http = discord.http.HTTPClient(asyncio.get_running_loop())
+        await self.http.static_login('stub-token')
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.http.close()
+        discord.http.Route.BASE = self.base
+        await self.server.close()
+
+    async def request(self, method, path, payload):
+        await self.http.request(discord.http.Route(method, path), json=payload)
+
+
+class FakeMember:
+    def __init__(self, stub, guild, member_id):
+        self.stub = stub
+        self.guild = guild
+        self.id = member_id
+        self.roles = []
+        self.bot = False
+        self.mention = f'<@{member_id}>'
+
+    async def add_roles(self, *roles, reason=None, atomic=True):
+        await self.stub.request(
+            'PATCH', f'/guilds/{self.guild.id}/members/{self.id}', {'roles': [r.id for r in roles]}
+        )
+        self.roles.extend(roles)
+
+
+class FakeChannel:
+    def __init__(self, stub, channel_id):
+        self.stub = stub
+        self.id = channel_id
+
+    async def send(self, embed=None):
+        await self.stub.request('POST', f'/channels/{self.id}/messages', {'embeds': [embed.to_dict()]})
+
+
+def make_guild(guild_id, channel=None):
+    roles = {1: SimpleNamespace(id=1)}
+    return SimpleNamespace(id=guild_id, name=f'Guild {guild_id}', get_role=roles.get,
+                           get_channel=lambda channel_id: channel)
+
+
+async def run_queue(queue, jobs, timeout=5.0):
+    queue.start()
+    try:
+        for job in jobs:
+            await queue.put(job)
+        await asyncio.wait_for(queue.join(), timeout)
+    finally:
+        await queue.stop()
+
+
+def test_role_assignments_are_paced_per_guild():
+    async def scenario():
+        async with DiscordStub() as stub:
+            guild = make_guild(1)
+            queue = RoleAssignmentQueue(workers=2, rate=50.0)
+            start = time.monotonic()
+            await run_queue(queue, [RoleJob(FakeMember(stub, guild, i), [1]) for i in range(75)])
+            return stub, queue, time.monotonic() - start
+
+    stub, queue, elapsed = asyncio.run(scenario())
+    assert queue.stats['assigned'] == 75
+    assert len(stub.patches) == 75
+    # The first 50 use the bucket's burst, the remaining 25 arrive at 50/s
+    assert elapsed >= 0.45
+
+
+def test_rate_limited_assignment_is_retried_by_discord_py():
+    async def scenario():
+        async with DiscordStub(rate_limited={7: 1}) as stub:
+            guild = make_guild(1)
+            queue = RoleAssignmentQueue(workers=1, rate=100.0)
+            await run_queue(queue, [RoleJob(FakeMember(stub, guild, i), [1]) for i in range(5, 10)])
+            return stub, queue
+
+    stub, queue = asyncio.run(scenario())
+    # HTTPClient slept through the 429 and sent the PATCH again itself
+    assert queue.stats == {'enqueued': 5, 'assigned': 5, 'retried': 0, 'failed': 0, 'dropped': 0}
+    assert [member_id for _, _, member_id in stub.patches].count(7) == 2
+
+
+def test_exhausted_rate_limit_is_requeued():
+    async def scenario():
+        # discord.py gives up after 5 tries and raises HTTPException(429)
+        async with DiscordStub(rate_limited={7: 5}) as stub:
+            guild = make_guild(1)
+            queue = RoleAssignmentQueue(workers=1, rate=100.0, retry_delay=0.01)
+            await run_queue(queue, [RoleJob(FakeMember(stub, guild, i), [1]) for i in range(5, 10)])
+            return stub, queue
+
+    stub, queue = asyncio.run(scenario())
+    assert queue.stats == {'enqueued': 5, 'assigned': 5, 'retried': 1, 'failed': 0, 'dropped': 0}
+    assert [member_id for _, _, member_id in stub.patches].count(7) == 6
+
+
+def test_full_queue_applies_backpressure_and_drops():
+    async def scenario():
+        async with DiscordStub() as stub:
+            guild = make_guild(1)
+            queue = RoleAssignmentQueue(maxsize=2, enqueue_timeout=0.05)
+            accepted = [await queue.put(RoleJob(FakeMember(stub, guild, i), [1])) for i in range(3)]
+
+            # A retry that comes due while the queue is full is dropped rather than blocking
+            queue._schedule_retry(RoleJob(FakeMember(stub, guild, 9), [1]), 0.01)
+            await asyncio.sleep(0.05)
+            return accepted, queue
+
+    accepted, queue = asyncio.run(scenario())
+    assert accepted == [True, True, False]
+    assert queue.stats['dropped'] == 2
+    assert not queue.retries
+
+
+def test_welcomes_are_batched_during_join_waves():
+    async def scenario():
+        async with DiscordStub() as stub:
+            channel = FakeChannel(stub, 42)
+            guild = make_guild(1, channel)
+            bot = SimpleNamespace(
+                config=SimpleNamespace(welcome_batch_threshold=3, welcome_batch_interval=10,
+                                       role_queue_size=100, role_queue_workers=1, role_assign_rate=2.0),
+                get_guild_config=lambda guild_id: {'welcome_channel': 42, 'auto_roles': []},
+                get_guild=lambda guild_id: guild
+            )
+            cog = Welcome(bot)
+            for member_id in range(1, 6):
+                await cog.on_member_join(FakeMember(stub, guild, member_id))
+            singles = list(stub.messages)
+            await cog._flush_pending()
+            return singles, stub.messages[len(singles):]
+
+    singles, batched = asyncio.run(scenario())
+    assert [msg['embeds'][0]['title'] for _, msg in singles] == ["👋 Welcome!", "👋 Welcome!"]
+    assert len(batched) == 1
+    channel_id, msg = batched[0]
+    assert channel_id == 42
+    assert msg['embeds'][0]['title'] == "👋 Welcome to 3 new members!"
+    assert msg['embeds'][0]['description'] == "<@3>, <@4>, <@5>"
+
+
+def test_full_role_queue_does_not_delay_welcomes():
+    async def scenario():
+        async with DiscordStub() as stub:
+            channel = FakeChannel(stub, 42)
+            guild = make_guild(1, channel)
+            bot = SimpleNamespace(
+                config=SimpleNamespace(welcome_batch_threshold=10, welcome_batch_interval=10,
+                                       role_queue_size=1, role_queue_workers=1, role_assign_rate=2.0),
+                get_guild_config=lambda guild_id: {'welcome_channel': 42, 'auto_roles': [1]},
+                get_guild=lambda guild_id: guild
+            )
+            cog = Welcome(bot)
+            cog.role_queue.enqueue_timeout = 0.5
+            await cog.on_member_join(FakeMember(stub, guild, 1))
+
+            # The queue is now full and its workers aren't running, so this join waits on backpressure
+            join = asyncio.create_task(cog.on_member_join(FakeMember(stub, guild, 2)))
+            await asyncio.sleep(0.1)
+            welcomed_while_waiting = len(stub.messages)
+            await join
+            return welcomed_while_waiting, cog.role_queue.stats['dropped']
+
+    welcomed_while_waiting, dropped = asyncio.run(scenario())
+    assert welcomed_while_waiting == 2
+    assert dropped == 1